@@ -0,0 +1,80 @@
+class AdaptiveSweep:
+    """
+    Sweep plan that samples u_control coarsely and refines only where the tuning curve bends.
+
+    All points come from the uniform u_vco_delta grid. The first pass takes every `coarse`-th grid
+    point plus the ends; after every pass each interior point is checked against the straight line
+    through its neighbours, and intervals where that deviation exceeds f_tol (MHz) or where
+    the power changes by more than p_tol (dB) are split at their grid midpoint. Zero tolerance
+    disables its check. Refinement stops when no interval needs splitting or the grid step is reached.
+    """
+    def __init__(self, u_srcs, grid, f_tol, p_tol, coarse=4):
+        self._u_srcs = list(u_srcs)
+        self._grid = list(grid)
+        self._index = {round(u, 6): k for k, u in enumerate(self._grid)}
+        self._f_tol = f_tol
+        self._p_tol = p_tol
+        self._coarse = max(1, int(coarse))
+
+        self._measured = {u_src: dict() for u_src in self._u_srcs}
+        self.passes = 0
+
+    @property
+    def uniform(self):
+        return len(self._u_srcs) * len(self._grid)
+
+    @property
+    def measured(self):
+        return sum(len(points) for points in self._measured.values())
+
+    @property
+    def saved(self):
+        return self.uniform - self.measured
+
+    def initial(self):
+        last = len(self._grid) - 1
+        indices = set(range(0, last, self._coarse)) | {last}
+        # curvature needs at least three points per series
+        if len(indices) < 3 and last > 1:
+            indices.add(last // 2)
+        indices = sorted(indices)
+        return self._steps({u_src: indices for u_src in self._u_srcs})
+
+    def add(self, point):
+        k = self._index.get(round(point['u_control'], 6))
+        if k is not None:
+            self._measured[point['u_src']][k] = (point['read_f'], point['read_p'])
+
+    def refine(self):
+        self.passes += 1
+        return self._steps({u_src: self._split(points) for u_src, points in self._measured.items()})
+
+    def summary(self):
+        return {
+            'points': self.measured,
+            'uniform': self.uniform,
+            'saved': self.saved,
+            'passes': self.passes,
+        }
+
+    def _split(self, points):
+        indices = sorted(points)
+        marked = set()
+
+        for a, b in zip(indices, indices[1:]):
+            if self._p_tol > 0 and abs(points[b][1] - points[a][1]) > self._p_tol:
+                marked.add((a, b))
+
+        for l, i, r in zip(indices, indices[1:], indices[2:]):
+            if self._f_tol <= 0:
+                break
+            (f_l, _), (f_i, _), (f_r, _) = points[l], points[i], points[r]
+            u_l, u_i, u_r = self._grid[l], self._grid[i], self._grid[r]
+            linear = f_l + (f_r - f_l) * (u_i - u_l) / (u_r - u_l)
+            if abs(f_i - linear) > self._f_tol:
+                marked.update([(l, i), (i, r)])
+
+        return sorted({(a + b) // 2 for a, b in marked if b - a > 1})
+
+    def _steps(self, indices):
+        return [(u_src, self._grid[k]) for u_src in self._u_srcs for k in indices[u_src]]
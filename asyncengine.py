@@ -0,0 +1,179 @@
+import asyncio
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import log
+from sweepplan import SINGLE_SWEEP, harmonic_orders, sweep_point
+
+MEGA = 1_000_000
+MILLI = 1 / 1_000
+
+
+class AsyncInstrument:
+    """
+    Awaitable operations over a ScpiTransport with a timeout on every call.
+
+    Each instrument gets its own I/O thread, so calls to one instrument stay ordered while
+    different instruments run concurrently. A cancelled or timed out await returns at once,
+    the blocking VISA call is left to finish on the I/O thread.
+    """
+    def __init__(self, name, transport, timeout=5.0):
+        self.name = name
+        self._transport = transport
+        self._timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'io-{name}')
+
+    async def write(self, *commands, timeout=None):
+        def send():
+            for command in commands:
+                self._transport.send(command)
+            self._transport.flush()
+        return await self._call(send, timeout)
+
+    async def query(self, question, *setup, timeout=None):
+        """Send `setup` commands and ask `question` in one I/O call."""
+        def ask():
+            for command in setup:
+                self._transport.send(command)
+            return self._transport.query(question)
+        return await self._call(ask, timeout)
+
+    async def query_many(self, questions, timeout=None):
+        return await self._call(lambda: self._transport.query_many(questions), timeout)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _call(self, func, timeout):
+        timeout = timeout or self._timeout
+        future = asyncio.get_running_loop().run_in_executor(self._executor, func)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise RuntimeError(f'{self.name}: no answer in {timeout} s') from None
+
+
+class AsyncSweep:
+    """
+    Tuning sweep and harmonic sweep of a MeasureCore as one coroutine,
+    run by MeasureCore.measure with asyncio.run on the thread that measures.
+
+    Dwell is an asyncio sleep and every instrument call is awaited with a timeout, a watcher
+    turns token.cancelled into task cancellation, so cancel takes effect within `cancel_poll`
+    even in the middle of a dwell or a hung query. Analyzer readout and source current readout
+    of a step run concurrently. Markers are read from one single sweep per step taken after the
+    dwell, as in the threaded engine; marker tracking is threads only.
+    """
+    cancel_poll = 0.02
+
+    def __init__(self, core, timeout=5.0):
+        self._core = core
+        self._timeout = timeout
+
+    async def run(self, token, secondary, plan):
+        core = self._core
+        src = AsyncInstrument('Источник', core._transports['Источник'], self._timeout)
+        sa = AsyncInstrument('Анализатор', core._transports['Анализатор'], self._timeout)
+
+        watcher = asyncio.ensure_future(self._watch(token, asyncio.current_task()))
+        start = time.perf_counter()
+        points = 0
+        try:
+            await self._setup(src, sa, secondary)
+
+            steps, adaptive = plan
+            while steps:
+                for step in steps:
+                    point = await self._measure_point(src, sa, step, secondary)
+                    core._add_measure_point(point)
+                    if adaptive is not None:
+                        adaptive.add(point)
+                    points += 1
+                steps = adaptive.refine() if adaptive is not None else None
+            if adaptive is not None:
+                log.info('adaptive sweep: %s', adaptive.summary())
+
+            await self._harmonic_sweep(src, sa, secondary)
+        except asyncio.CancelledError:
+            if token.cancelled:
+                raise RuntimeError('measurement cancelled') from None
+            raise
+        finally:
+            watcher.cancel()
+            results = await asyncio.gather(
+                src.write('OUTP OFF', timeout=1.0),
+                sa.write(':INIT:CONT ON', timeout=1.0),
+                return_exceptions=True,
+            )
+            for ex in results:
+                if ex is not None:
+                    log.warning('instrument reset failed: %s', ex)
+            src.close()
+            sa.close()
+            log.info('async sweep: %s points in %.3f s', points, time.perf_counter() - start)
+
+    async def _watch(self, token, task):
+        while not token.cancelled:
+            await asyncio.sleep(self.cancel_poll)
+        task.cancel()
+
+    async def _setup(self, src, sa, secondary):
+        await asyncio.gather(
+            src.write('INST:SEL OUTP1', f'CURR {secondary["i_src_max"]}mA', 'OUTP ON'),
+            sa.write(
+                f':SENS:FREQ:STAR {secondary["sa_min"]}GHz',
+                f':SENS:FREQ:STOP {secondary["sa_max"]}GHz',
+                f':DISP:WIND:TRAC:Y:RLEV {secondary["sa_rlev"]}',
+                ':CALC:MARK1:MODE POS',
+                ':INIT:CONT OFF',
+            ),
+        )
+
+    async def _measure_point(self, src, sa, step, secondary):
+        await self._program_source(src, *step)
+        await self._settle(sa, secondary)
+
+        (read_f, read_p), read_i = await asyncio.gather(
+            self._marker(sa),
+            src.query('MEAS:CURR?', 'INST:SEL OUTP1'),
+        )
+        return sweep_point(*step, float(read_f) / MEGA, float(read_p), float(read_i) / MILLI)
+
+    async def _marker(self, sa):
+        # same single sweep capture as the threaded engine, the marker never reads a sweep in progress
+        await sa.query(SINGLE_SWEEP)
+        await sa.write(':CALC:MARK1:MAX')
+        return await sa.query_many([':CALC:MARK1:X?', ':CALC:MARK1:Y?'])
+
+    async def _harmonic_sweep(self, src, sa, secondary):
+        result = self._core.result
+        points = list(zip(*[result.column(c).tolist() for c in ['u_src', 'u_control', 'read_f']]))
+
+        for order in harmonic_orders(secondary):
+            for u_src, u_control, read_f in points:
+                await self._program_source(src, u_src, u_control)
+                await self._settle(sa, secondary)
+                await sa.query(
+                    SINGLE_SWEEP,
+                    f':SENS:FREQ:CENT {order * read_f}MHz',
+                    f':SENS:FREQ:SPAN {secondary["sa_span"]}MHz',
+                )
+                read_p = await sa.query(':CALC:MARK1:Y?', ':CALC:MARK1:MAX')
+                self._core._add_harmonic_point(order, {'u_src': u_src, 'u_control': u_control, 'read_p': float(read_p)})
+
+    async def _program_source(self, src, u_src, u_control):
+        await src.write('INST:SEL OUTP1', f'VOLT {u_src}V', 'INST:SEL OUTP2', f'VOLT {u_control}V')
+
+    async def _settle(self, sa, secondary):
+        mode = self._core._dwell_mode()
+        settle = secondary['dwell'] * MILLI
+        if mode == 'fixed':
+            await asyncio.sleep(settle)
+        elif mode == 'opc':
+            deadline = time.perf_counter() + settle
+            while time.perf_counter() < deadline:
+                if int(float(await sa.query('*OPC?'))) == 1:
+                    return
+                await asyncio.sleep(0.005)
+            log.warning('*OPC? timeout after %s s', settle)
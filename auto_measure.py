@@ -0,0 +1,158 @@
+"""
+Headless measurement entry point, no Qt involved.
+
+    python -m auto_measure run --device A1462-01 --params params.ini
+    python -m auto_measure lot --device A1462-01 --device A1462-02 --export csv
+    python -m auto_measure lot --device A1462-01 --matrix matrix.ini
+    python -m auto_measure stations --config stations.ini
+
+Heavy modules are imported inside the commands, startup time to the first SCPI command is printed.
+"""
+import argparse
+import sys
+import time
+
+_start = time.perf_counter()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='auto_measure', description='VCO tuning measurement without GUI')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='measure one device')
+    run.add_argument('--device', required=True, help='device key from devices.ini')
+    run.set_defaults(handler=_run)
+
+    lot = commands.add_parser('lot', help='measure a lot of devices unattended')
+    lot.add_argument('--device', action='append', help='device key from devices.ini, all devices if omitted')
+    lot.add_argument('--matrix', help='file with a list of secondary params overrides, each one measured on every device')
+    lot.set_defaults(handler=_lot)
+
+    stations = commands.add_parser('stations', help='run every station from a stations file in parallel')
+    stations.add_argument('--config', default='stations.ini', help='stations file')
+    stations.add_argument('--mock', action='store_true', help='replay mock_data instead of real instruments')
+    stations.set_defaults(handler=_stations)
+
+    for sub in [run, lot]:
+        sub.add_argument('--params', default='params.ini', help='secondary params file')
+        sub.add_argument('--export', choices=['xlsx', 'csv', 'none'], default='xlsx')
+        sub.add_argument('--mock', action='store_true', help='replay mock_data instead of real instruments')
+        sub.add_argument('--latency', type=float, default=0.0, help='mock bus latency per transaction, ms')
+        sub.add_argument('--jitter', type=float, default=0.0, help='mock bus latency jitter, ms')
+        sub.add_argument('--quiet', action='store_true', help='warnings and errors only')
+        sub.add_argument('--dwell-mode', choices=['auto', 'fixed', 'opc', 'replay'], default='auto',
+                         help='source settle policy, auto skips the dwell for --mock and plot table replay')
+        sub.add_argument('--engine', choices=['threads', 'asyncio'], default='threads', help='sweep execution engine')
+        sub.add_argument('--acquisition', choices=['marker', 'trace'], default='marker', help='marker peak search or full trace')
+        sub.add_argument('--tracking', action='store_true', help='narrow analyzer span around the predicted frequency')
+        sub.add_argument('--profile', action='store_true', help='time the hot path, dump a JSON report per sweep')
+
+    args = parser.parse_args(argv)
+    if getattr(args, 'engine', None) == 'asyncio' and args.tracking:
+        parser.error('--tracking is not supported by --engine asyncio')
+    return args.handler(args)
+
+
+def _run(args):
+    core = _connect(args)
+    if core is None:
+        return 1
+
+    from measurecore import CancelToken
+    token = CancelToken()
+    params = (args.device, core.secondaryParams.params)
+
+    _startup_report()
+    core.check(token, params)
+    core.measure(token, params)
+    if not core.hasResult:
+        print('measurement failed')
+        return 1
+
+    core.result.process()
+    header, rows = core.result.get_result_table_data()
+    for row in rows:
+        print(dict(zip(header, row)))
+
+    if args.export != 'none':
+        core.result.device = args.device
+        export = core.result.export_excel if args.export == 'xlsx' else core.result.export_csv
+        print('exported', export(explore=False))
+
+    from instrumentation import profiler
+    if profiler.enabled:
+        print(profiler.summary())
+    return 0
+
+
+def _lot(args):
+    core = _connect(args)
+    if core is None:
+        return 1
+
+    from forgot_again.file import load_ast_if_exists
+    from lotrunner import LotRunner
+    matrix = load_ast_if_exists(args.matrix, default=None) if args.matrix else None
+    if args.matrix and not matrix:
+        print('no overrides in', args.matrix)
+        return 1
+
+    _startup_report()
+    runner = LotRunner(core, devices=args.device, matrix=matrix, export=None if args.export == 'none' else args.export)
+    print('lot summary:', runner.run())
+    return 0 if all('error' not in unit for unit in runner.units) else 1
+
+
+def _stations(args):
+    from stationmanager import StationManager
+    manager = StationManager.from_config(args.config, mock=args.mock)
+    manager.start()
+    try:
+        last = 0
+        while manager.running:
+            manager.poll(timeout=1.0)
+            if len(manager.units) != last:
+                last = len(manager.units)
+                print(manager.status, manager.summary())
+    except KeyboardInterrupt:
+        manager.stop()
+    manager.join()
+    print('stations summary:', manager.summary())
+    return 0 if all(s == 'done' for s in manager.status.values()) else 1
+
+
+def _connect(args):
+    import logging
+    from instrumentation import profiler, setup_logging
+    setup_logging(logging.WARNING if args.quiet else logging.INFO)
+    profiler.enabled = profiler.enabled or args.profile
+
+    if args.mock:
+        from instr import instrumentfactory
+        from mockreplay import replay_bench
+        instrumentfactory.mock_enabled = True
+        replay_bench(latency=args.latency / 1000, jitter=args.jitter / 1000)
+
+    from measurecore import MeasureCore
+    core = MeasureCore()
+    core.secondaryParams.load_from_config(args.params)
+    core.dwellMode = args.dwell_mode
+    core.engine = args.engine
+    core.acquisition = args.acquisition
+    core.tracking = args.tracking
+    if not args.quiet:
+        core.subscribe(lambda indices: print(f'points: {indices[-1] + 1}'))
+
+    core.connect(dict())
+    if not core.found:
+        print('instruments not found:', core)
+        return None
+    return core
+
+
+def _startup_report():
+    print(f'startup: {(time.perf_counter() - _start) * 1000:.0f} ms to first SCPI command')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
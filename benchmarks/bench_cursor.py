@@ -0,0 +1,43 @@
+"""
+Cursor readout lookup: PlotCursor's searchsorted over a cached sorted x-index
+against the linear Python scan the mouseMoved_* handlers used before.
+
+    python benchmarks/bench_cursor.py [points ...]
+"""
+import sys
+import timeit
+
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from primaryplotwidget import _find_value_index
+
+
+def _linear_index(freqs, freq):
+    return min(range(len(freqs)), key=lambda i: abs(freqs[i] - freq))
+
+
+def main(sizes, lookups=200):
+    rng = np.random.default_rng(0)
+    print(f'{"points":>8} {"linear, µs":>11} {"searchsorted, µs":>17} {"index build, µs":>16}')
+    for n in sizes:
+        xs = np.sort(rng.uniform(0.0, 10.0, n))
+        targets = rng.uniform(-1.0, 11.0, lookups)
+
+        order = np.argsort(xs, kind='stable')
+        sorted_xs = xs[order]
+        for x in targets:
+            assert xs[_find_value_index(sorted_xs, order, x)] == xs[_linear_index(xs, x)]
+
+        repeat = max(1, 2000 // n)
+        linear = timeit.timeit(lambda: [_linear_index(xs, x) for x in targets], number=repeat) / repeat / lookups
+        search = timeit.timeit(lambda: [_find_value_index(sorted_xs, order, x) for x in targets], number=100) / 100 / lookups
+        build = timeit.timeit(lambda: xs[np.argsort(xs, kind='stable')], number=100) / 100
+        print(f'{n:>8} {linear * 1e6:>11.1f} {search * 1e6:>17.2f} {build * 1e6:>16.1f}')
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [100, 1_000, 10_000, 100_000])
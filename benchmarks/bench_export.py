@@ -0,0 +1,73 @@
+"""
+Peak memory and time of MeasureResult.export_excel / export_csv at 100k and 1M rows.
+Memory is the tracemalloc peak during the export alone, the result is built beforehand;
+time comes from a separate untraced run.
+Files go to a temporary directory and are removed afterwards.
+
+    python benchmarks/bench_export.py [rows ...]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from measureresult import MeasureResult
+
+SUPPLIES = [4.7, 5.0, 5.3]
+
+
+def _result(rows):
+    result = MeasureResult()
+    for i in range(rows):
+        u_src = SUPPLIES[i % len(SUPPLIES)]
+        u_control = (i // len(SUPPLIES)) * 0.0001
+        f, p, current = 9000.0 + 400 * u_control, -5.0 - 0.1 * u_control, 30.0 + u_control
+        result.add_point({
+            'u_src': u_src, 'u_control': u_control, 'read_f': f, 'read_p': p, 'read_i': current,
+            'series1': u_src, 'x1': u_control, 'y1': f,
+            'series2': u_src, 'x2': u_control, 'y2': p,
+            'series3': u_src, 'x3': u_control, 'y3': current,
+            'series4': '', 'x4': 0, 'y4': 0,
+        })
+    return result
+
+
+def measure(export):
+    # tracemalloc slows python down several times, time and memory come from separate runs
+    start = time.perf_counter()
+    path = export(explore=False)
+    elapsed = time.perf_counter() - start
+    os.remove(path)
+
+    tracemalloc.start()
+    path = export(explore=False)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, Path(path).stat().st_size
+
+
+def main(sizes):
+    # exports write to ./xlsx, run them inside a scratch directory
+    directory = tempfile.mkdtemp(prefix='bench_export_')
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        print(f'{"rows":>9} {"format":>6} {"time, s":>8} {"peak, MB":>9} {"file, MB":>9}')
+        for n in sizes:
+            result = _result(n)
+            for name, export in [('csv', result.export_csv), ('xlsx', result.export_excel)]:
+                elapsed, peak, size = measure(export)
+                print(f'{n:>9} {name:>6} {elapsed:>8.1f} {peak / 2 ** 20:>9.1f} {size / 2 ** 20:>9.1f}', flush=True)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [100_000, 1_000_000])
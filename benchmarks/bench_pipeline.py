@@ -0,0 +1,94 @@
+"""
+Wall-clock time of a mock instrument sweep, pipelined against serial stages,
+on the replay bench with simulated bus latency. Then modelled analyzer sweep time
+per point (2.5 * span / rbw^2, see mockreplay.ReplayBench) of full range sweeps
+against marker tracking over an sa_min..sa_max analyzer range.
+
+    python benchmarks/bench_pipeline.py [--latency MS] [--jitter MS] [--dwell MS] [--sa-min GHZ] [--sa-max GHZ]
+
+Run from the repo root (mock_data and devices.ini are read from there).
+"""
+import argparse
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from instr import instrumentfactory
+
+from measurearchive import MeasureArchive
+from measurecore import CancelToken, MeasureCore
+from mockreplay import replay_bench
+
+
+def measure(dwell, archive, pipelined=True, tracking=False, **params):
+    core = MeasureCore()
+    core.secondaryParams.params = {**core.secondaryParams.defaults, 'dwell': dwell, **params}
+    core.archive = MeasureArchive(archive)
+    core.pipelined = pipelined
+    core.tracking = tracking
+    # the mock would skip the dwell, whose overlap is what is measured here
+    core.dwellMode = 'fixed'
+    core.connect(dict())
+
+    device = next(iter(core.deviceParams))
+    params = (device, core.secondaryParams.params)
+    core.check(None, params)
+
+    bench = replay_bench()
+    transactions, sweep_seconds = bench.transactions, bench.sweep_seconds
+    start = time.perf_counter()
+    core.measure(CancelToken(), params)
+    elapsed = time.perf_counter() - start
+    return {
+        'elapsed': elapsed,
+        'points': len(core.result.column('u_src')),
+        'transactions': bench.transactions - transactions,
+        'sweep_seconds': bench.sweep_seconds - sweep_seconds,
+        'retries': core.trackingRetries,
+        'result': core.result,
+    }
+
+
+def _same_readings(results, a, b):
+    for key in ['read_f', 'read_p', 'read_i']:
+        assert (results[a]['result'].column(key) == results[b]['result'].column(key)).all(), f'{a} / {b}: {key} differs'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency', type=float, default=10.0, help='bus latency per transaction, ms')
+    parser.add_argument('--jitter', type=float, default=0.0, help='bus latency jitter, ms')
+    parser.add_argument('--dwell', type=float, default=20.0, help='source settle time, ms')
+    parser.add_argument('--sa-min', type=float, default=9.0, help='analyzer range start for the tracking case, GHz')
+    parser.add_argument('--sa-max', type=float, default=13.0, help='analyzer range stop for the tracking case, GHz')
+    parser.add_argument('--sa-span', type=float, default=50.0, help='narrowest tracking span, MHz')
+    args = parser.parse_args()
+
+    import logging
+    logging.getLogger('auto_measure').setLevel(logging.WARNING)
+
+    instrumentfactory.mock_enabled = True
+    replay_bench(latency=args.latency / 1000, jitter=args.jitter / 1000, seed=0)
+
+    results = dict()
+    with tempfile.TemporaryDirectory() as archive:
+        for name, pipelined in [('serial', False), ('pipelined', True)]:
+            run = results[name] = measure(args.dwell, archive, pipelined=pipelined)
+            print(f'{name:>10}: {run["points"]} points, {run["transactions"]} bus transactions, '
+                  f'{run["elapsed"]:.2f} s, {run["elapsed"] / run["points"] * 1000:.1f} ms/point')
+        _same_readings(results, 'serial', 'pipelined')
+
+        analyzer = {'sa_min': args.sa_min, 'sa_max': args.sa_max, 'sa_span': args.sa_span}
+        print(f'analyzer {args.sa_min}..{args.sa_max} GHz, rbw {replay_bench().rbw / 1e3:.0f} kHz:')
+        for name, tracking in [('full range', False), ('tracking', True)]:
+            run = results[name] = measure(args.dwell, archive, tracking=tracking, **analyzer)
+            print(f'{name:>10}: {run["points"]} points, {run["sweep_seconds"] / run["points"]:.2f} s analyzer sweep/point, '
+                  f'{run["retries"]} widen retries, {run["transactions"]} bus transactions')
+        _same_readings(results, 'full range', 'tracking')
+
+if __name__ == '__main__':
+    main()
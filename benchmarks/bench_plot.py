@@ -0,0 +1,79 @@
+"""
+Frame time of PrimaryPlotWidget._redraw with 10k and 100k points in the sweep result.
+
+Every frame adds a burst of new points (what the frame timer coalesces) and redraws,
+the render column adds painting the plot window to an offscreen pixmap.
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_plot.py [points ...]
+"""
+import os
+import sys
+import time
+
+from pathlib import Path
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PyQt5.QtWidgets import QApplication
+
+from measureresult import MeasureResult
+from primaryplotwidget import PrimaryPlotWidget
+
+SUPPLIES = [4.7, 5.0, 5.3]
+
+
+class _Controller:
+    def __init__(self):
+        self.result = MeasureResult()
+
+
+def _point(i):
+    u_src = SUPPLIES[i % len(SUPPLIES)]
+    u_control = (i // len(SUPPLIES)) * 0.001
+    return {
+        'series1': u_src, 'x1': u_control, 'y1': 9000.0 + 400 * u_control,
+        'series2': u_src, 'x2': u_control, 'y2': -5.0 - 0.1 * u_control,
+        'series3': u_src, 'x3': u_control, 'y3': 30.0 + u_control,
+        'series4': '', 'x4': 0, 'y4': 0,
+    }
+
+
+def measure(app, points, frames=30, burst=30):
+    controller = _Controller()
+    widget = PrimaryPlotWidget(controller=controller)
+    widget.resize(1200, 800)
+    widget.show()
+    widget._build()
+
+    for i in range(points):
+        controller.result.add_point(_point(i))
+    widget._redraw()
+    app.processEvents()
+
+    redraw = render = 0.0
+    for frame in range(frames):
+        for i in range(points + frame * burst, points + (frame + 1) * burst):
+            controller.result.add_point(_point(i))
+        start = time.perf_counter()
+        widget._redraw()
+        middle = time.perf_counter()
+        widget._win.grab()
+        end = time.perf_counter()
+        redraw += middle - start
+        render += end - start
+
+    widget.close()
+    return redraw / frames, render / frames
+
+
+def main(sizes):
+    app = QApplication(sys.argv)
+    print(f'{"points":>8} {"redraw, ms":>11} {"redraw + render, ms":>20}')
+    for n in sizes:
+        redraw, render = measure(app, n)
+        print(f'{n:>8} {redraw * 1000:>11.2f} {render * 1000:>20.2f}')
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000])
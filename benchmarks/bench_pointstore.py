@@ -0,0 +1,81 @@
+"""
+Memory and append throughput of ColumnTable / SeriesStore against the list-of-dicts
+plus defaultdict(list) structures MeasureResult used before.
+
+    python benchmarks/bench_pointstore.py [points ...]
+"""
+import sys
+import time
+import tracemalloc
+
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pointstore import ColumnTable, SeriesStore
+
+
+def _points(n):
+    supplies = [4.7, 5.0, 5.3]
+    for i in range(n):
+        u_src = supplies[i % 3]
+        u_control = (i // 3) * 0.01
+        yield {
+            'u_src': u_src, 'u_control': u_control,
+            'read_f': 9000.0 + 400 * u_control, 'read_p': -5.0, 'read_i': 30.0,
+            'series1': u_src, 'x1': u_control, 'y1': 9000.0 + 400 * u_control,
+            'series2': u_src, 'x2': u_control, 'y2': -5.0,
+            'series3': u_src, 'x3': u_control, 'y3': 30.0,
+            'series4': '', 'x4': 0, 'y4': 0,
+        }
+
+
+def _lists(points):
+    raw, processed = list(), list()
+    series = [defaultdict(list) for _ in range(4)]
+    for p in points:
+        raw.append(p)
+        processed.append(dict(p))
+        for n, data in enumerate(series, start=1):
+            data[p[f'series{n}']].append([p[f'x{n}'], p[f'y{n}']])
+    return raw, processed, series
+
+
+def _columns(points):
+    raw = ColumnTable()
+    series = [SeriesStore() for _ in range(4)]
+    for p in points:
+        raw.append(p)
+        for n, data in enumerate(series, start=1):
+            data.append(p[f'series{n}'], p[f'x{n}'], p[f'y{n}'])
+    return raw, series
+
+
+def measure(build, n):
+    points = list(_points(n))
+
+    start = time.perf_counter()
+    build(points)
+    elapsed = time.perf_counter() - start
+
+    # timed and traced separately, tracemalloc slows allocation-heavy code down several times
+    tracemalloc.start()
+    kept = build(points)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    # point dicts belong to the caller in both cases, only the store overhead is counted
+    return elapsed, current
+
+
+def main(sizes):
+    print(f'{"points":>8} {"store":>14} {"append, µs/pt":>14} {"memory, MB":>11}')
+    for n in sizes:
+        for name, build in [('lists/dicts', _lists), ('columnar', _columns)]:
+            elapsed, memory = measure(build, n)
+            print(f'{n:>8} {name:>14} {elapsed / n * 1e6:>14.2f} {memory / 2 ** 20:>11.2f}')
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000])
@@ -0,0 +1,76 @@
+"""
+Per-point overhead of building sweep rows from the plot tables: the old twelve pandas
+lookups per row against tablecache.aligned_columns plus zip, on 10k-row tables.
+
+    python benchmarks/bench_rows.py [rows ...]
+"""
+import sys
+import time
+
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tablecache import Table, aligned_columns
+
+
+def _tables(rows):
+    u = np.arange(rows) * 0.01
+    series = np.array([f'{s}' for s in np.resize([4.7, 5.0, 5.3], rows)])
+    return [
+        Table(['Uп=# В', 'F, МГц', 'Uупр, В'], [series, u, 9000.0 + 400 * u]),
+        Table(['Uп=# В', 'P, дБм', 'Uупр, В'], [series[:rows // 2], u[:rows // 2], -5.0 - u[:rows // 2]]),
+        Table(['Uп=# В', 'I, мА', 'Uупр, В'], [series, u, 30.0 + u]),
+        Table(),
+    ]
+
+
+def _pandas_rows(tables):
+    df1, df2, df3, df4 = [t.to_frame() for t in tables]
+    for index in range(len(df1)):
+        yield {
+            'series1': df1[df1.columns[0]][index],
+            'x1': df1[df1.columns[1]][index],
+            'y1': df1[df1.columns[2]][index],
+
+            'series2': '' if df2.empty else df2[df2.columns[0]].get(index, 0),
+            'x2': 0 if df2.empty else df2[df2.columns[1]].get(index, 0),
+            'y2': 0 if df2.empty else df2[df2.columns[2]].get(index, 0),
+
+            'series3': '' if df3.empty else df3[df3.columns[0]].get(index, 0),
+            'x3': 0 if df3.empty else df3[df3.columns[1]].get(index, 0),
+            'y3': 0 if df3.empty else df3[df3.columns[2]].get(index, 0),
+
+            'series4': '' if df4.empty else df4[df4.columns[0]].get(index, 0),
+            'x4': 0 if df4.empty else df4[df4.columns[1]].get(index, 0),
+            'y4': 0 if df4.empty else df4[df4.columns[2]].get(index, 0),
+        }
+
+
+def _aligned_rows(tables):
+    columns = aligned_columns(tables)
+    keys = list(columns)
+    for values in zip(*[col.tolist() for col in columns.values()]):
+        yield dict(zip(keys, values))
+
+
+def measure(build, tables):
+    start = time.perf_counter()
+    rows = list(build(tables))
+    return time.perf_counter() - start, rows
+
+
+def main(sizes):
+    print(f'{"rows":>8} {"pandas, µs/pt":>14} {"aligned, µs/pt":>15} {"speedup":>8}')
+    for n in sizes:
+        tables = _tables(n)
+        slow, old = measure(_pandas_rows, tables)
+        fast, new = measure(_aligned_rows, tables)
+        assert old == new, 'row contents differ'
+        print(f'{n:>8} {slow / n * 1e6:>14.2f} {fast / n * 1e6:>15.2f} {slow / fast:>7.0f}x')
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [10_000])
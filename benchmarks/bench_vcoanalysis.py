@@ -0,0 +1,88 @@
+"""
+vco_characteristics against a naive per-point Python loop on 100k sweep points.
+
+    python benchmarks/bench_vcoanalysis.py [points ...]
+"""
+import sys
+import time
+
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from vcoanalysis import vco_characteristics
+
+SUPPLIES = [4.7, 5.0, 5.3]
+
+
+def _sweep(n):
+    u_src = np.resize(SUPPLIES, n)
+    u_control = np.repeat(np.linspace(0.0, 10.0, -(-n // len(SUPPLIES))), len(SUPPLIES))[:n]
+    f = 9000.0 + 300 * u_control + 4 * u_control ** 2 + 50 * u_src
+    p = -5.0 + np.sin(u_control)
+    i = 30.0 + u_src
+    return u_src, u_control, f, p, i
+
+
+def naive(u_src, u_control, f, p, i):
+    series = defaultdict(list)
+    for point in zip(u_src.tolist(), u_control.tolist(), f.tolist(), p.tolist(), i.tolist()):
+        series[point[0]].append(point[1:])
+
+    result = dict()
+    for supply, points in series.items():
+        points.sort()
+        us = [pt[0] for pt in points]
+        fs = [pt[1] for pt in points]
+        kvco = list()
+        for k in range(len(points)):
+            if k == 0:
+                kvco.append((fs[1] - fs[0]) / (us[1] - us[0]))
+            elif k == len(points) - 1:
+                kvco.append((fs[k] - fs[k - 1]) / (us[k] - us[k - 1]))
+            else:
+                hs, hd = us[k] - us[k - 1], us[k + 1] - us[k]
+                kvco.append((hs ** 2 * fs[k + 1] + (hd ** 2 - hs ** 2) * fs[k] - hd ** 2 * fs[k - 1]) / (hs * hd * (hd + hs)))
+
+        n = len(points)
+        sx, sy = sum(us), sum(fs)
+        sxx, sxy = sum(u * u for u in us), sum(u * f for u, f in zip(us, fs))
+        slope = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+        offset = (sy - slope * sx) / n
+        deviation = max(abs(f - (offset + slope * u)) for u, f in zip(us, fs))
+
+        ps = [pt[2] for pt in points]
+        result[supply] = {
+            'f_min': min(fs), 'f_max': max(fs),
+            'kvco_min': min(kvco), 'kvco_max': max(kvco),
+            'linearity': deviation / (max(fs) - min(fs)) * 100,
+            'p_min': min(ps), 'p_max': max(ps),
+            'i_min': min(pt[3] for pt in points), 'i_max': max(pt[3] for pt in points),
+        }
+    return result
+
+
+def main(sizes):
+    vco_characteristics(*_sweep(100))  # first call pays numpy's lazy imports
+    print(f'{"points":>8} {"naive, ms":>10} {"vectorized, ms":>15} {"speedup":>8}')
+    for n in sizes:
+        sweep = _sweep(n)
+
+        start = time.perf_counter()
+        slow = naive(*sweep)
+        middle = time.perf_counter()
+        fast = vco_characteristics(*sweep)
+        end = time.perf_counter()
+
+        for k, supply in enumerate(fast['u_src'].tolist()):
+            for key, value in slow[supply].items():
+                assert np.isclose(fast[key][k], value, rtol=1e-9), (supply, key)
+
+        print(f'{n:>8} {(middle - start) * 1000:>10.1f} {(end - middle) * 1000:>15.1f} {(middle - start) / (end - middle):>7.0f}x')
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000])
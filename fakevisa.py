@@ -0,0 +1,83 @@
+import time
+
+from scpitransport import make_block
+
+
+class FakeVisaResource:
+    """
+    Local stand-in for a pyvisa resource, pluggable as `inst` into the instr drivers.
+    Counts bus transactions and adds a fixed latency to each of them,
+    so round-trip savings can be measured without hardware.
+
+    Subclasses simulate an instrument by overriding `_command` (setting commands),
+    `_answer` (queries) and `_trace_block` (TRAC:DATA? binary block).
+    """
+    def __init__(self, idn='1,FAKE,1', latency=0.0, responses=None, trace=None):
+        self._latency = latency
+        self._responses = {
+            '*IDN?': idn,
+            '*OPC?': '1',
+            **(responses or dict()),
+        }
+        self._trace = trace if trace is not None else [0.0] * 1001
+
+        self._pending = list()
+        self._pending_raw = None
+
+        self.writes = 0
+        self.reads = 0
+        self.log = list()
+
+    @property
+    def round_trips(self):
+        return self.writes + self.reads
+
+    def write(self, command):
+        self._transact()
+        self.writes += 1
+        self.log.append(command)
+        for part in _split(command):
+            header, _, arg = part.partition(' ')
+            header = header.upper()
+            if header.startswith('TRAC:DATA?'):
+                self._pending_raw = self._trace_block()
+            elif header.endswith('?'):
+                self._pending.append(str(self._answer(header, part)))
+            else:
+                self._command(header, arg)
+        return len(command)
+
+    def read(self):
+        self._transact()
+        self.reads += 1
+        answer = ';'.join(self._pending)
+        self._pending.clear()
+        return answer
+
+    def read_raw(self):
+        self._transact()
+        self.reads += 1
+        data, self._pending_raw = self._pending_raw or b'', None
+        return data
+
+    def query(self, question):
+        self.write(question)
+        return self.read()
+
+    def _command(self, header, arg):
+        pass
+
+    def _answer(self, header, question):
+        answer = self._responses.get(header, self._responses.get(f':{header}', '0'))
+        return answer(question) if callable(answer) else answer
+
+    def _trace_block(self):
+        return make_block(self._trace)
+
+    def _transact(self):
+        if self._latency:
+            time.sleep(self._latency)
+
+
+def _split(command):
+    return [part.strip().lstrip(':') for part in command.split(';') if part.strip()]
@@ -0,0 +1,67 @@
+import numpy as np
+
+
+class HarmonicSuppression:
+    """
+    Harmonic suppression in dBc relative to the fundamental, for every harmonic order and supply series.
+
+    Harmonic sweeps are joined to the fundamental sweep on u_control per supply series
+    (sorted merge with linear interpolation between harmonic steps, NaN outside the harmonic sweep),
+    instead of zipping the lists by position. Joins are cached per order, so after an offset change
+    only the offsets are re-applied.
+    """
+    def __init__(self):
+        self._fundamental = None
+        self._harmonics = dict()
+        self._joined = dict()
+
+    def set_fundamental(self, u_src, u_control, p):
+        self._fundamental = _arrays(u_src, u_control, p)
+        self._joined.clear()
+
+    def set_harmonic(self, order, u_src, u_control, p):
+        self._harmonics[order] = _arrays(u_src, u_control, p)
+        self._joined.pop(order, None)
+
+    def clear(self):
+        self._fundamental = None
+        self._harmonics.clear()
+        self._joined.clear()
+
+    @property
+    def orders(self):
+        return sorted(self._harmonics)
+
+    def suppression(self, offsets=None):
+        """{order: dBc per fundamental point}, offsets are harmonic power corrections in dB per order."""
+        if self._fundamental is None:
+            return dict()
+        offsets = offsets or dict()
+        _, _, p = self._fundamental
+        return {order: self._join(order) + offsets.get(order, 0.0) - p for order in self.orders}
+
+    def _join(self, order):
+        try:
+            return self._joined[order]
+        except KeyError:
+            pass
+
+        us, uc, _ = self._fundamental
+        h_us, h_uc, h_p = self._harmonics[order]
+
+        order_index = np.lexsort((h_uc, h_us))
+        h_us, h_uc, h_p = h_us[order_index], h_uc[order_index], h_p[order_index]
+        supplies, starts = np.unique(h_us, return_index=True)
+        stops = np.append(starts[1:], len(h_us))
+
+        joined = np.full(len(uc), np.nan)
+        for u_src, start, stop in zip(supplies, starts, stops):
+            mask = np.isclose(us, u_src)
+            joined[mask] = np.interp(uc[mask], h_uc[start:stop], h_p[start:stop], left=np.nan, right=np.nan)
+
+        self._joined[order] = joined
+        return joined
+
+
+def _arrays(*columns):
+    return tuple(np.asarray(c, dtype=float) for c in columns)
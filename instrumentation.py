@@ -0,0 +1,195 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+from functools import wraps
+
+from forgot_again.file import make_dirs
+from forgot_again.string import now_timestamp
+from onlinestats import RunningStats
+
+log = logging.getLogger('auto_measure')
+
+
+class _Timer:
+    __slots__ = ('_profiler', '_name', '_start')
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._profiler.add(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_null_timer = _NullTimer()
+
+
+class _Histogram:
+    """Running stats plus power-of-two microsecond buckets."""
+    def __init__(self):
+        self.stats = RunningStats()
+        self.total = 0.0
+        self.buckets = dict()
+
+    def add(self, seconds):
+        self.stats.add(seconds)
+        self.total += seconds
+        bucket = max(0, math.ceil(math.log2(max(seconds * 1e6, 1.0))))
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, q):
+        # upper bucket edge the q-th sample falls into
+        rank = q * self.stats.n
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(2 ** bucket / 1e6, self.stats.max)
+        return self.stats.max
+
+    def report(self):
+        return {
+            'count': self.stats.n,
+            'total': self.total,
+            'mean': self.stats.mean,
+            'min': self.stats.min,
+            'max': self.stats.max,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'histogram_us': {f'<={2 ** b}': n for b, n in sorted(self.buckets.items())},
+        }
+
+
+class Profiler:
+    """
+    Named timers and counters for the sweep hot path.
+
+    Disabled by default (set AUTO_MEASURE_PROFILE=1 or `enabled`), then timer() hands out
+    a shared no-op context manager and count() returns right away.
+    """
+    path = 'profile'
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._timers = dict()
+        self._counters = dict()
+        self._lock = threading.Lock()
+
+    def timer(self, name):
+        if not self.enabled:
+            return _null_timer
+        return _Timer(self, name)
+
+    def timed(self, name):
+        """Method decorator version of timer(), enabled state is checked per call."""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Timer(self, name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def add(self, name, seconds):
+        with self._lock:
+            try:
+                hist = self._timers[name]
+            except KeyError:
+                hist = self._timers[name] = _Histogram()
+            hist.add(seconds)
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def reset(self):
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+
+    def report(self):
+        with self._lock:
+            return {
+                'timers': {k: v.report() for k, v in sorted(self._timers.items())},
+                'counters': dict(sorted(self._counters.items())),
+            }
+
+    def summary(self):
+        report = self.report()
+        lines = [f'{"timer":<18}{"n":>7}{"total, ms":>11}{"mean, ms":>10}{"p95, ms":>10}{"max, ms":>10}']
+        for name, t in report['timers'].items():
+            lines.append(
+                f'{name:<18}{t["count"]:>7}{t["total"] * 1e3:>11.1f}{t["mean"] * 1e3:>10.3f}'
+                f'{t["p95"] * 1e3:>10.3f}{t["max"] * 1e3:>10.3f}'
+            )
+        for name, n in report['counters'].items():
+            lines.append(f'{name:<18}{n:>7}')
+        return '\n'.join(lines)
+
+    def dump(self):
+        make_dirs(self.path)
+        file_name = f'./{self.path}/sweep-{now_timestamp()}.json'
+        with open(file_name, mode='wt', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+        return os.path.abspath(file_name)
+
+
+profiler = Profiler(enabled=bool(os.environ.get('AUTO_MEASURE_PROFILE')))
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets through at most `rate` records per second for every message template below WARNING,
+    the number of dropped records is appended to the next one that passes.
+    """
+    def __init__(self, rate=2.0):
+        super().__init__()
+        self._interval = 1.0 / rate
+        self._last = dict()
+        self._dropped = dict()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        now = time.monotonic()
+        key = record.msg
+        if now - self._last.get(key, -math.inf) < self._interval:
+            self._dropped[key] = self._dropped.get(key, 0) + 1
+            return False
+        self._last[key] = now
+        dropped = self._dropped.pop(key, 0)
+        if dropped:
+            record.msg = f'{record.msg} (+{dropped} suppressed)'
+        return True
+
+
+def setup_logging(level=logging.INFO, rate=2.0):
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s', datefmt='%H:%M:%S'))
+    handler.addFilter(RateLimitFilter(rate))
+    log.addHandler(handler)
+    log.setLevel(level)
+    log.propagate = False
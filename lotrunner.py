@@ -0,0 +1,108 @@
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
+
+from measurecore import CancelToken
+from measureresult import MeasureResult
+
+
+class LotRunner:
+    """
+    Unattended measurement of a lot: check -> measure -> process -> export for every
+    (device, secondary params override) pair, on the controller's already open instruments.
+
+    Each unit gets its own MeasureResult, so processing and excel export of a finished unit
+    run on a background worker while the next unit is being measured.
+    """
+    def __init__(self, controller, devices=None, matrix=None, export='xlsx', on_unit=None):
+        self._controller = controller
+        self._devices = list(devices or controller.deviceParams)
+        self._matrix = list(matrix or [dict()])
+        self._export = export
+        self._on_unit = on_unit or _print_unit
+
+        self.units = list()
+        self.elapsed = 0.0
+
+    @property
+    def plan(self):
+        return list(product(self._devices, self._matrix))
+
+    def run(self, token=None):
+        token = token or CancelToken()
+        controller = self._controller
+        base = dict(controller.secondaryParams.params)
+
+        self.units.clear()
+        start = time.perf_counter()
+        lock = threading.Lock()
+        pending = list()
+
+        # one worker keeps exports in measure order and never competes with itself for the GIL
+        with ThreadPoolExecutor(max_workers=1) as worker:
+            try:
+                for n, (device, overrides) in enumerate(self.plan, start=1):
+                    if token.cancelled:
+                        break
+                    unit = {'n': n, 'device': device, 'params': dict(overrides)}
+
+                    params = {**base, **overrides}
+                    controller.secondaryParams.params = params
+                    controller.result = MeasureResult()
+                    controller.result.device = device
+
+                    t0 = time.perf_counter()
+                    controller.hasResult = False
+                    try:
+                        controller.check(token, (device, params))
+                        controller.measure(token, (device, params))
+                    except Exception as ex:
+                        # a bad unit (unknown device, instrument error) must not stop the rest of the lot
+                        unit['error'] = f'{type(ex).__name__}: {ex}'
+                    unit['measure'] = time.perf_counter() - t0
+                    if 'error' in unit or not controller.hasResult:
+                        unit.setdefault('error', 'measure failed')
+                        self._finish(unit, lock)
+                        continue
+
+                    pending.append(worker.submit(self._post, controller.result, unit, lock))
+            finally:
+                controller.secondaryParams.params = base
+                for future in pending:
+                    future.result()
+
+        self.elapsed = time.perf_counter() - start
+        return self.summary()
+
+    def summary(self):
+        done = [u for u in self.units if 'error' not in u]
+        return {
+            'units': len(done),
+            'failed': len(self.units) - len(done),
+            'elapsed': round(self.elapsed, 2),
+            'units_per_hour': round(len(done) / self.elapsed * 3600, 1) if self.elapsed else 0.0,
+        }
+
+    def _post(self, result, unit, lock):
+        t0 = time.perf_counter()
+        try:
+            result.process()
+            if self._export == 'xlsx':
+                unit['file'] = result.export_excel(explore=False)
+            elif self._export == 'csv':
+                unit['file'] = result.export_csv(explore=False)
+        except Exception as ex:
+            unit['error'] = str(ex)
+        unit['post'] = time.perf_counter() - t0
+        self._finish(unit, lock)
+
+    def _finish(self, unit, lock):
+        with lock:
+            self.units.append(unit)
+        self._on_unit(unit)
+
+
+def _print_unit(unit):
+    print(f'unit {unit["n"]} {unit["device"]} {unit["params"]}:', unit.get('error') or unit.get('file', 'done'))
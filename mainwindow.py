@@ -1,21 +1,24 @@
 import datetime
 import os
+import threading
 import time
 
 from subprocess import Popen
 
-from PyQt5 import uic
 from PyQt5.QtGui import QGuiApplication
-from PyQt5.QtWidgets import QMainWindow
+from PyQt5.QtWidgets import QMainWindow, QMessageBox
 from PyQt5.QtCore import Qt, pyqtSignal, pyqtSlot
 
 from formlayout.formlayout import fedit
+from instrumentation import log, profiler
 from instrumentcontroller import InstrumentController
 from measuremodel import MeasureModel
 from measurewidgetwithsecondaryparams import MeasureWidgetWithSecondaryParameters
 from mytools.connectionwidget import ConnectionWidget
 from primaryplotwidget import PrimaryPlotWidget
 from resulttablewidget import ResultTableWidget
+from startupprofile import startup
+from uicache import load_ui
 
 
 class MainWindow(QMainWindow):
@@ -23,6 +26,7 @@ class MainWindow(QMainWindow):
     instrumentsFound = pyqtSignal()
     sampleFound = pyqtSignal()
     measurementFinished = pyqtSignal()
+    exportFailed = pyqtSignal(str)
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -31,15 +35,17 @@ class MainWindow(QMainWindow):
         self.setAttribute(Qt.WA_DeleteOnClose)
 
         self._instrumentController = InstrumentController(parent=self)
+        startup.mark('controller')
         self._connectionWidget = ConnectionWidget(parent=self, controller=self._instrumentController)
         self._measureWidget = MeasureWidgetWithSecondaryParameters(parent=self, controller=self._instrumentController)
         self._plotWidget = PrimaryPlotWidget(parent=self, controller=self._instrumentController)
 
         self._resultNodel = MeasureModel(parent=self)
         self._resultTableWidget = ResultTableWidget(parent=self, controller=self._instrumentController)
+        startup.mark('widgets')
 
         # init UI
-        self._ui = uic.loadUi('mainwindow.ui', self)
+        self._ui = load_ui('mainwindow.ui', self)
         self.setWindowTitle('Измерение ГУНов')
 
         self._ui.layInstrs.insertWidget(0, self._connectionWidget)
@@ -56,18 +62,24 @@ class MainWindow(QMainWindow):
 
         self._ui.grpProgress.hide()
 
+        self._exportThread = None
+
         self._init()
+        startup.mark('main window ui')
 
     def _init(self):
         self._connectionWidget.connected.connect(self.on_instrumens_connected)
         self._connectionWidget.connected.connect(self._measureWidget.on_instrumentsConnected)
 
         self._measureWidget.secondaryChanged.connect(self._instrumentController.on_secondary_changed)
+        self._measureWidget.secondaryChanged.connect(self.on_secondary_changed)
 
         self._measureWidget.measureStarted.connect(self.on_measureStarted)
         self._measureWidget.measureComplete.connect(self.on_measureComplete)
 
         self._instrumentController.pointReady.connect(self.on_point_ready)
+        # export runs off the GUI thread, queued connection brings its failure back here
+        self.exportFailed.connect(self.on_exportFailed)
 
         self._measureWidget.updateWidgets(self._instrumentController.secondaryParams)
 
@@ -98,6 +110,14 @@ class MainWindow(QMainWindow):
         print('meas complete')
         self._instrumentController.result.process()
         self._resultTableWidget.updateResult()
+        if profiler.enabled:
+            self._ui.pteditProgress.setPlainText(profiler.summary())
+            self._ui.grpProgress.show()
+
+    @pyqtSlot(dict)
+    def on_secondary_changed(self, _):
+        if self._instrumentController.result.update_offsets(self._instrumentController.secondaryParams):
+            self._resultTableWidget.updateResult()
 
     @pyqtSlot()
     def on_measureStarted(self):
@@ -110,13 +130,14 @@ class MainWindow(QMainWindow):
             ('Калибровка', self._instrumentController.cal_set),
             ('Только основные', self._plotWidget.only_main_states),
             ('Набор для коррекции', [1, '+25', '+85', '-60']),
+            ('Движок измерения', [self._instrumentController.engine, ('threads', 'Потоки'), ('asyncio', 'asyncio')]),
         ]
 
         values = fedit(data=data, title='Параметры')
         if not values:
             return
 
-        adjust, cal_set, only_main_states, adjust_set = values
+        adjust, cal_set, only_main_states, adjust_set, engine = values
 
         self._instrumentController.result.adjust = adjust
         self._instrumentController.result.adjust_set = adjust_set
@@ -124,11 +145,14 @@ class MainWindow(QMainWindow):
         self._instrumentController.only_main_states = only_main_states
         self._instrumentController.result.only_main_states = only_main_states
         self._plotWidget.only_main_states = only_main_states
+        self._instrumentController.engine = engine
 
-    @pyqtSlot()
-    def on_point_ready(self):
+    @pyqtSlot(list)
+    @profiler.timed('gui.point_ready')
+    def on_point_ready(self, indices):
         self._ui.pteditProgress.setPlainText(self._instrumentController.result.report)
         self._plotWidget.plot()
+        self._resultTableWidget.updateLive()
 
     def closeEvent(self, _):
         self._instrumentController.saveConfigs()
@@ -138,7 +162,22 @@ class MainWindow(QMainWindow):
 
     @pyqtSlot()
     def on_btnExcel_clicked(self):
-        self._instrumentController.result.export_excel()
+        if self._exportThread is not None and self._exportThread.is_alive():
+            print('export already running')
+            return
+        self._exportThread = threading.Thread(target=self._export, daemon=True)
+        self._exportThread.start()
+
+    def _export(self):
+        try:
+            print('exported', self._instrumentController.result.export_excel())
+        except Exception as ex:
+            log.exception('export error')
+            self.exportFailed.emit(str(ex))
+
+    @pyqtSlot(str)
+    def on_exportFailed(self, message):
+        QMessageBox.warning(self, 'Ошибка экспорта', message)
 
     @pyqtSlot()
     def on_btnScreenShot_clicked(self):
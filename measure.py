@@ -1,13 +1,24 @@
 import sys
 
+from startupprofile import startup
+
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QApplication
+from instrumentation import setup_logging
 from mainwindow import MainWindow
 
+startup.mark('imports')
+
 
 def main(args):
+    setup_logging()
     app = QApplication(args)
+    startup.mark('qapplication')
     window = MainWindow()
     window.show()
+    startup.mark('show')
+    # deferred plot build is queued by show(), report after the first event loop pass
+    QTimer.singleShot(0, lambda: (startup.mark('first event loop'), startup.report()))
     sys.exit(app.exec_())
 
 
@@ -0,0 +1,152 @@
+import ast
+import os
+import threading
+
+from pathlib import Path
+
+import numpy as np
+
+from forgot_again.string import now_timestamp
+
+
+class MeasureArchive:
+    """
+    Append-only on-disk store of measured sweeps.
+
+    Every app session writes one binary file: a sequence of .npy blobs, one per chunk of points.
+    index.txt holds one python literal per line, a run header (device, timestamp, secondary params)
+    and a (file, offset, rows) record for every chunk, harmonic chunks also carry their order,
+    so runs can be listed and loaded one at a time without reading the whole archive.
+    Chunks are fsync'ed as they are written, a crash mid-sweep loses at most the chunk being collected.
+
+    The parsed index is kept in memory: own appends are added as they are written,
+    lines appended by another process are parsed once, when the file is seen to have grown.
+    """
+    chunk_size = 256
+
+    def __init__(self, path='archive'):
+        self._path = Path(path)
+        self._index = self._path / 'index.txt'
+        self._session = None
+        self._lock = threading.RLock()
+        self._parsed = list()
+        self._parsed_size = 0
+
+    def begin(self, device, params):
+        self._path.mkdir(parents=True, exist_ok=True)
+        if self._session is None:
+            self._session = self._path / f'session-{now_timestamp()}.bin'
+        timestamp = now_timestamp()
+        run = f'{device}-{timestamp}'
+        self._append_index({'run': run, 'device': device, 'timestamp': timestamp, 'params': dict(params)})
+        return RunWriter(self, run)
+
+    def runs(self, device=None, **params):
+        """Run headers, optionally filtered by device and secondary param values."""
+        return [
+            rec for rec in self._records()
+            if 'device' in rec
+            and (device is None or rec['device'] == device)
+            and all(rec['params'].get(k) == v for k, v in params.items())
+        ]
+
+    def load(self, run, harmonic=None):
+        """Points of a run, or its harmonic sweep rows of order `harmonic`."""
+        chunks = [
+            rec for rec in self._records()
+            if rec.get('run') == run and 'offset' in rec and rec.get('harmonic') == harmonic
+        ]
+        if not chunks:
+            return np.zeros(0)
+        arrays = list()
+        for rec in chunks:
+            with open(self._path / rec['file'], mode='rb') as f:
+                f.seek(rec['offset'])
+                arrays.append(np.load(f, allow_pickle=False))
+        return np.concatenate(arrays)
+
+    def _write_chunk(self, run, data, harmonic=None):
+        record = {'run': run, 'file': self._session.name}
+        if harmonic is not None:
+            record['harmonic'] = harmonic
+        with self._lock:
+            with open(self._session, mode='ab') as f:
+                offset = f.tell()
+                np.save(f, data, allow_pickle=False)
+                f.flush()
+                os.fsync(f.fileno())
+            self._append_index({**record, 'offset': offset, 'rows': len(data)})
+
+    def _append_index(self, record):
+        line = (repr(record) + '\n').encode('utf-8')
+        with self._lock:
+            self._records()
+            with open(self._index, mode='ab') as f:
+                start = f.tell()
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            # nobody else appended in between: the parsed index stays current without re-reading
+            if start == self._parsed_size:
+                self._parsed.append(record)
+                self._parsed_size = start + len(line)
+
+    def _records(self):
+        with self._lock:
+            try:
+                size = self._index.stat().st_size
+            except FileNotFoundError:
+                return []
+            if size < self._parsed_size:
+                # index replaced
+                self._parsed, self._parsed_size = list(), 0
+            if size > self._parsed_size:
+                with open(self._index, mode='rb') as f:
+                    f.seek(self._parsed_size)
+                    tail = f.read()
+                # complete lines only, a line still being written is parsed on a later call
+                end = tail.rfind(b'\n') + 1
+                for line in tail[:end].decode('utf-8').splitlines():
+                    try:
+                        self._parsed.append(ast.literal_eval(line))
+                    except (SyntaxError, ValueError):
+                        # torn line after a crash
+                        continue
+                self._parsed_size += end
+            return list(self._parsed)
+
+
+class RunWriter:
+    """Collects numeric point fields of one run, and of its harmonic sweeps, and writes them to the archive chunk by chunk."""
+    def __init__(self, archive, run):
+        self._archive = archive
+        self.run = run
+        # harmonic order (None for the tuning sweep) -> [fields, rows]
+        self._tables = dict()
+
+    def add(self, point):
+        self._add(None, point)
+
+    def add_harmonic(self, order, point):
+        self._add(order, point)
+
+    def flush(self):
+        for harmonic in self._tables:
+            self._flush(harmonic)
+
+    def _add(self, harmonic, point):
+        if harmonic not in self._tables:
+            fields = [k for k, v in point.items() if isinstance(v, (int, float)) and not isinstance(v, bool)]
+            self._tables[harmonic] = fields, list()
+        fields, rows = self._tables[harmonic]
+        rows.append(tuple(point.get(k, np.nan) for k in fields))
+        if len(rows) >= self._archive.chunk_size:
+            self._flush(harmonic)
+
+    def _flush(self, harmonic):
+        fields, rows = self._tables[harmonic]
+        if not rows:
+            return
+        data = np.array(rows, dtype=[(k, float) for k in fields])
+        rows.clear()
+        self._archive._write_chunk(self.run, data, harmonic)
@@ -0,0 +1,493 @@
+from forgot_again.file import load_ast_if_exists, pprint_to_file
+
+from instr import instrumentfactory
+from instrumentation import log, profiler
+
+from measurearchive import MeasureArchive
+from measureresult import MeasureResult
+from mockreplay import ReplaySourceFactory, ReplayAnalyzerFactory
+from pointbatcher import PointBatcher
+from scpitransport import ScpiTransport
+from secondaryparams import SecondaryParams
+from sweepexecutor import PipelinedSweep, SerialSweep
+from sweepplan import SINGLE_SWEEP, harmonic_orders, sweep_plan, sweep_point
+from sweepscheduler import SweepScheduler
+from traceacquisition import PEAK_RANGE, TRACE_POINTS, SpanTracker, TuningPredictor, find_peaks
+from tablecache import aligned_columns, load_plot_tables, PLOT_TABLES
+
+GIGA = 1_000_000_000
+MEGA = 1_000_000
+KILO = 1_000
+MILLI = 1 / 1_000
+
+
+class CancelToken:
+    """Headless counterpart of the measure widget cancel token."""
+    def __init__(self):
+        self.cancelled = False
+
+
+class MeasureCore:
+    """
+    Measurement logic without Qt: instrument lookup, check, sweep, result and archive.
+    Point updates go to plain callbacks registered with subscribe(), called with a list of new point indices.
+    """
+    def __init__(self):
+        addrs = load_ast_if_exists('instr.ini', default={
+            'Анализатор': 'GPIB1::18::INSTR',
+            'Источник': 'GPIB1::3::INSTR',
+        })
+
+        self.requiredInstruments = {
+            'Анализатор': ReplayAnalyzerFactory(addrs['Анализатор']),
+            'Источник': ReplaySourceFactory(addrs['Источник']),
+        }
+
+        self.deviceParams = load_ast_if_exists('devices.ini', default={
+            'ГУН': {
+                'file': 'input.xlsx',
+            },
+        })
+
+        self.secondaryParams = SecondaryParams(required={
+            'sep_4': ['', {'value': None}],
+            'u_src_drift_1': [
+                'Uп1=',
+                {'start': 0.0, 'end': 10.0, 'step': 0.5, 'value': 4.7, 'suffix': ' В'}
+            ],
+            'u_src_drift_2': [
+                'Uп2=',
+                {'start': 0.0, 'end': 10.0, 'step': 0.5, 'value': 5.0, 'suffix': ' В'}
+            ],
+            'u_src_drift_3': [
+                'Uп3=',
+                {'start': 0.0, 'end': 10.0, 'step': 0.5, 'value': 5.3, 'suffix': ' В'}
+            ],
+            'i_src_max': [
+                'Iп.макс=',
+                {'start': 0.0, 'end': 500.0, 'step': 1.0, 'value': 50.0, 'suffix': ' мА'}
+            ],
+            'sep_1': ['', {'value': None}],
+            'u_vco_min': [
+                'Uупр.мин.=',
+                {'start': 0.0, 'end': 30.0, 'step': 0.5, 'decimals': 2, 'value': 0.0, 'suffix': ' В'}
+            ],
+            'u_vco_max': [
+                'Uупр.макс.=',
+                {'start': 0.0, 'end': 30.0, 'step': 0.5, 'decimals': 2, 'value': 10.0, 'suffix': ' В'}
+            ],
+            'u_vco_delta': [
+                'ΔUупр=',
+                {'start': 0.0, 'end': 30.0, 'step': 0.5, 'decimals': 2, 'value': 1.0, 'suffix': ' В'}
+            ],
+            'dwell': [
+                'Tзад=',
+                {'start': 0.0, 'end': 10000.0, 'step': 10.0, 'value': 100.0, 'suffix': ' мс'}
+            ],
+            'sep_2': ['', {'value': None}],
+            'sa_min': [
+                'Start=',
+                {'start': 0.0, 'end': 30.0, 'step': 0.5, 'value': 1.0, 'suffix': ' ГГц'}
+            ],
+            'sa_max': [
+                'Stop=',
+                {'start': 0.0, 'end': 30.0, 'step': 0.5, 'value': 1.0, 'suffix': ' ГГц'}
+            ],
+            'sa_rlev': [
+                'Ref lev=',
+                {'start': -30.0, 'end': 30.0, 'step': 1.0, 'value': 10.0, 'suffix': ' дБ'}
+            ],
+            'sa_span': [
+                'Span=',
+                {'start': 0.0, 'end': 30000.0, 'step': 1.0, 'value': 50.0, 'suffix': ' МГц'}
+            ],
+            'adapt_f_tol': [
+                'ΔFдоп=',
+                {'start': 0.0, 'end': 1000.0, 'step': 1.0, 'decimals': 1, 'value': 0.0, 'suffix': ' МГц'}
+            ],
+            'adapt_p_tol': [
+                'ΔPдоп=',
+                {'start': 0.0, 'end': 30.0, 'step': 0.1, 'decimals': 2, 'value': 0.0, 'suffix': ' дБ'}
+            ],
+            'sep_3': ['', {'value': None}],
+            'harmonic_order': [
+                'Гарм.до x',
+                {'start': 1.0, 'end': 3.0, 'step': 1.0, 'decimals': 0, 'value': 1.0, 'suffix': ''}
+            ],
+            'x2_offset': [
+                'Смещ.x2=',
+                {'start': -30.0, 'end': 30.0, 'step': 0.1, 'decimals': 2, 'value': 0.0, 'suffix': ' дБ'}
+            ],
+            'x3_offset': [
+                'Смещ.x3=',
+                {'start': -30.0, 'end': 30.0, 'step': 0.1, 'decimals': 2, 'value': 0.0, 'suffix': ' дБ'}
+            ],
+        })
+        self.secondaryParams.load_from_config('params.ini')
+
+        self._instruments = dict()
+        self._transports = dict()
+        self.found = False
+        self.present = False
+        self.hasResult = False
+        # 'auto' skips the dwell when replaying mock_data or plot tables, SweepScheduler.modes otherwise
+        self.dwellMode = 'auto'
+        self.engine = 'threads'
+        self.acquisition = 'marker'
+        self.tracking = False
+        self.trackingRetries = 0
+        self.pipelined = True
+
+        self.result = MeasureResult()
+        self.archive = MeasureArchive('archive')
+        self._run = None
+        self._observers = list()
+        self._batcher = PointBatcher(self._notify, max_rate=30.0, max_latency=0.1)
+
+    def subscribe(self, callback):
+        self._observers.append(callback)
+
+    def _notify(self, indices):
+        for callback in self._observers:
+            callback(indices)
+
+    def __str__(self):
+        return f'{self._instruments}'
+
+    # region connections
+    def connect(self, addrs):
+        print(f'searching for {addrs}')
+        for k, v in addrs.items():
+            self.requiredInstruments[k].addr = v
+        self.found = self._find()
+
+    def _find(self):
+        self._instruments = {
+            k: v.find() for k, v in self.requiredInstruments.items()
+        }
+        self._transports = {
+            k: ScpiTransport(v) for k, v in self._instruments.items() if v
+        }
+        return all(self._instruments.values())
+
+    def check(self, token, params):
+        print(f'call check with {token} {params}')
+        device, secondary = params
+        self.present = self._check(token, device, secondary)
+        print('sample pass')
+
+    def _check(self, token, device, secondary):
+        print(f'launch check with {self.deviceParams[device]} {self.secondaryParams}')
+        self._init()
+        return True
+    # endregion
+
+    # region initialization
+    def _clear(self):
+        self.result.clear()
+
+    def _init(self):
+        with self._transports['Источник'].batch() as src:
+            src.send('*RST')
+            src.send('OUTP OFF')
+        self._transports['Анализатор'].send('*RST')
+        self._transports['Анализатор'].flush()
+    # endregion
+
+    def measure(self, token, params):
+        print(f'call measure with {token} {params}')
+        device, _ = params
+        try:
+            self.result.set_secondary_params(self.secondaryParams)
+            self._measure(token, device)
+            self._batcher.flush()
+            # self.hasResult = bool(self.result)
+            self.hasResult = True  # TODO HACK
+        except RuntimeError as ex:
+            self._batcher.flush()
+            print('runtime error:', ex)
+
+    def _measure(self, token, device):
+        param = self.deviceParams[device]
+        secondary = self.secondaryParams.params
+        print(f'launch measure with {token} {param} {secondary}')
+
+        self._clear()
+        profiler.reset()
+        self._run = self.archive.begin(device, secondary)
+        try:
+            self._do_measure(token, param, secondary)
+        finally:
+            self._run.flush()
+            if profiler.enabled:
+                log.info('sweep profile: %s', profiler.dump())
+        self.result.set_secondary_params(self.secondaryParams)
+        return True
+
+    @profiler.timed('sweep')
+    def _do_measure(self, token, param, secondary):
+        # plot tables present: replay them as a demo sweep, otherwise sweep the instruments
+        tabulated = PLOT_TABLES[0].is_file()
+        traced = self.acquisition == 'trace' and not tabulated
+        if self.engine == 'asyncio' and not tabulated and not traced:
+            if self.tracking:
+                raise RuntimeError('marker tracking is not supported by the asyncio engine')
+            import asyncio
+            from asyncengine import AsyncSweep
+            asyncio.run(AsyncSweep(self).run(token, secondary, sweep_plan(secondary)))
+            return
+
+        src = self._transports['Источник']
+        sa = self._transports['Анализатор']
+
+        scheduler = SweepScheduler(settle=secondary['dwell'] * MILLI, mode=self._dwell_mode(tabulated), instrument=sa)
+        scheduler.start()
+
+        adaptive = None
+        if tabulated:
+            steps, sweep = self._table_sweep(token, scheduler)
+        elif traced:
+            sweep = self._trace_sweep(token, secondary, scheduler)
+            steps, adaptive = sweep_plan(secondary)
+        else:
+            sweep = self._instrument_sweep(token, secondary, scheduler)
+            steps, adaptive = sweep_plan(secondary)
+
+        try:
+            while steps:
+                for raw_point in sweep.run(steps, token):
+                    if raw_point is None:
+                        # trace step without a valid peak, swept again in the retry pass
+                        continue
+                    harmonics = raw_point.pop('harmonics', None)
+                    self._add_measure_point(raw_point)
+                    if harmonics:
+                        self._add_harmonic_points(raw_point, harmonics)
+                    scheduler.mark()
+                    if adaptive is not None:
+                        adaptive.add(raw_point)
+                missed = self._tracker.retry() if traced else None
+                steps = missed or (adaptive.refine() if adaptive is not None else None)
+            if adaptive is not None:
+                log.info('adaptive sweep: %s', adaptive.summary())
+            if traced:
+                log.info('trace acquisition: %s analyzer retunes, %s missed steps retried, %s analyzer round trips for %s points',
+                         self._tracker.retunes, self._tracker.retries, sa.round_trips, len(self.result.column('u_src')))
+            elif not tabulated:
+                if self.tracking:
+                    log.info('marker tracking: %s widen retries', self.trackingRetries)
+                self._harmonic_sweep(token, secondary, scheduler)
+        finally:
+            src.send('OUTP OFF')
+            src.flush()
+            sa.send(':INIT:CONT ON')
+            sa.flush()
+
+        log.info('sweep timing: %s', scheduler.summary())
+
+    def _table_sweep(self, token, scheduler):
+        columns = aligned_columns(load_plot_tables())
+        keys = list(columns)
+        rows = zip(*[col.tolist() for col in columns.values()])
+
+        # source stage: settle for the step, analyzer stage: take the tabulated row as the reading
+        return rows, self._sweep(
+            program=lambda values: scheduler.settle(token),
+            capture=lambda values: dict(zip(keys, values)),
+        )
+
+    def _instrument_sweep(self, token, secondary, scheduler):
+        src = self._transports['Источник']
+        sa = self._transports['Анализатор']
+
+        with src.batch():
+            src.send('INST:SEL OUTP1')
+            src.send(f'CURR {secondary["i_src_max"]}mA')
+            src.send('OUTP ON')
+
+        with sa.batch():
+            sa.send(f':SENS:FREQ:STAR {secondary["sa_min"]}GHz')
+            sa.send(f':SENS:FREQ:STOP {secondary["sa_max"]}GHz')
+            sa.send(f':DISP:WIND:TRAC:Y:RLEV {secondary["sa_rlev"]}')
+            sa.send(':CALC:MARK1:MODE POS')
+            sa.send(':INIT:CONT OFF')
+
+        def program(step):
+            self._program_source(*step)
+            scheduler.settle(token)
+
+        # narrow center / span from the running tuning curve fit instead of the static sa_min..sa_max
+        predictor = TuningPredictor() if self.tracking else None
+        self.trackingRetries = 0
+
+        # capture only what needs the step's source state: one analyzer sweep and the supply current,
+        # the marker readout of the held sweep overlaps programming the next step
+        def capture(step):
+            if predictor is None:
+                self._single_sweep()
+                marker = None
+            else:
+                # a missed peak has to be swept again at this step, so tracking reads the marker here
+                marker = self._tracked_marker(predictor, step, secondary)
+            # source thread waits for the capture, safe to use it from here
+            src.send('INST:SEL OUTP1')
+            return marker, src.query('MEAS:CURR?')
+
+        def readout(step, handle):
+            marker, read_i = handle
+            if marker is None:
+                sa.send(':CALC:MARK1:MAX')
+                marker = sa.query_many([':CALC:MARK1:X?', ':CALC:MARK1:Y?'])
+            read_f, read_p = marker
+            return sweep_point(*step, float(read_f) / MEGA, float(read_p), float(read_i) / MILLI)
+
+        return self._sweep(program, capture, readout)
+
+    def _tracked_marker(self, predictor, step, secondary):
+        sa = self._transports['Анализатор']
+        f_min, f_max = secondary['sa_min'] * GIGA, secondary['sa_max'] * GIGA
+        threshold = secondary['sa_rlev'] - PEAK_RANGE
+
+        center, span = predictor.window(*step, min_span=secondary['sa_span'] * MEGA)
+        while True:
+            wide = center is None or span is None or span >= f_max - f_min
+            if wide:
+                sa.send(f':SENS:FREQ:STAR {f_min}Hz')
+                sa.send(f':SENS:FREQ:STOP {f_max}Hz')
+            else:
+                sa.send(f':SENS:FREQ:CENT {center}Hz')
+                sa.send(f':SENS:FREQ:SPAN {span}Hz')
+            self._single_sweep()
+            sa.send(':CALC:MARK1:MAX')
+            read_f, read_p = (float(v) for v in sa.query_many([':CALC:MARK1:X?', ':CALC:MARK1:Y?']))
+
+            # a missed peak leaves the marker on noise or at the span edge: widen and retry
+            if wide or (read_p > threshold and abs(read_f - center) < 0.45 * span):
+                break
+            span *= 4
+            self.trackingRetries += 1
+
+        predictor.add(*step, read_f)
+        return read_f, read_p
+
+    def _dwell_mode(self, tabulated=False):
+        if self.dwellMode != 'auto':
+            return self.dwellMode
+        # recorded or tabulated readings don't need the source to settle
+        return 'replay' if tabulated or instrumentfactory.mock_enabled else 'fixed'
+
+    def _single_sweep(self):
+        self._transports['Анализатор'].query(SINGLE_SWEEP)
+
+    def _sweep(self, program, capture, readout=None):
+        if self.pipelined:
+            return PipelinedSweep(program, capture, readout)
+        return SerialSweep(program, capture, readout)
+
+    def _trace_sweep(self, token, secondary, scheduler):
+        src = self._transports['Источник']
+        sa = self._transports['Анализатор']
+
+        with src.batch():
+            src.send('INST:SEL OUTP1')
+            src.send(f'CURR {secondary["i_src_max"]}mA')
+            src.send('OUTP ON')
+
+        with sa.batch():
+            sa.send(f':SENS:SWE:POIN {TRACE_POINTS}')
+            sa.send(f':DISP:WIND:TRAC:Y:RLEV {secondary["sa_rlev"]}')
+            sa.send(':INIT:CONT OFF')
+
+        # one trace holds the fundamental and the harmonics, the window follows the predicted frequency
+        orders = [1, *harmonic_orders(secondary)]
+        margin = secondary['sa_span'] * MEGA
+        threshold = secondary['sa_rlev'] - PEAK_RANGE
+        self._tracker = tracker = SpanTracker(secondary['sa_min'] * GIGA, secondary['sa_max'] * GIGA, margin, top_order=orders[-1])
+        sa.round_trips = 0
+
+        def program(step):
+            self._program_source(*step)
+            scheduler.settle(token)
+
+        # capture holds one sweep at the step's source state,
+        # the trace transfer and peak search overlap programming the next step
+        def capture(step):
+            start, stop, changed = tracker.next_window(*step)
+            if changed:
+                sa.send(f':SENS:FREQ:STAR {start}Hz')
+                sa.send(f':SENS:FREQ:STOP {stop}Hz')
+            self._single_sweep()
+            src.send('INST:SEL OUTP1')
+            return start, stop, src.query('MEAS:CURR?')
+
+        def readout(step, handle):
+            start, stop, read_i = handle
+            f_guess, search, default = tracker.search(*step)
+            peaks = find_peaks(sa.fetch_trace(), start, stop, orders=orders, f_guess=f_guess, tolerance=margin, search=search)
+            read_f, read_p = peaks[1]
+
+            # noise or the skirt of a peak outside the search range: widen and sweep the step again
+            bin_width = (stop - start) / (TRACE_POINTS - 1)
+            if not (read_p > threshold and abs(read_f - f_guess) < search - 2 * bin_width):
+                if default:
+                    raise RuntimeError(f'no peak above {threshold} dBm within '
+                                       f'{secondary["sa_min"]}..{secondary["sa_max"]} GHz at {step}')
+                tracker.miss(step)
+                return None
+
+            tracker.add(*step, read_f)
+            point = sweep_point(*step, read_f / MEGA, read_p, float(read_i) / MILLI)
+            point['harmonics'] = {order: p for order, (_, p) in peaks.items() if order > 1}
+            return point
+
+        return self._sweep(program, capture, readout)
+
+    def _add_harmonic_points(self, point, harmonics):
+        for order, read_p in harmonics.items():
+            self._add_harmonic_point(order, {'u_src': point['u_src'], 'u_control': point['u_control'], 'read_p': read_p})
+
+    def _harmonic_sweep(self, token, secondary, scheduler):
+        sa = self._transports['Анализатор']
+
+        points = list(zip(*[self.result.column(c).tolist() for c in ['u_src', 'u_control', 'read_f']]))
+
+        for order in harmonic_orders(secondary):
+            def program(point):
+                self._program_source(*point[:2])
+                scheduler.settle(token)
+
+            def capture(point):
+                sa.send(f':SENS:FREQ:CENT {order * point[2]}MHz')
+                sa.send(f':SENS:FREQ:SPAN {secondary["sa_span"]}MHz')
+                self._single_sweep()
+
+            def readout(point, handle):
+                sa.send(':CALC:MARK1:MAX')
+                return sa.query(':CALC:MARK1:Y?')
+
+            sweep = self._sweep(program, capture, readout)
+            for (u_src, u_control, _), read_p in zip(points, sweep.run(points, token)):
+                self._add_harmonic_point(order, {'u_src': u_src, 'u_control': u_control, 'read_p': float(read_p)})
+
+    def _program_source(self, u_src, u_control):
+        with self._transports['Источник'].batch() as src:
+            src.send('INST:SEL OUTP1')
+            src.send(f'VOLT {u_src}V')
+            src.send('INST:SEL OUTP2')
+            src.send(f'VOLT {u_control}V')
+
+    def _add_measure_point(self, data):
+        log.info('measured point: %s', data)
+        self._batcher.add(self.result.add_point(data))
+        self._run.add(data)
+
+    def _add_harmonic_point(self, order, data):
+        self.result.add_harmonic_point(order, data)
+        self._run.add_harmonic(order, data)
+
+    def saveConfigs(self):
+        pprint_to_file('params.ini', self.secondaryParams.params)
+
+    @property
+    def status(self):
+        return [i.status for i in self._instruments.values()]
@@ -1,4 +1,4 @@
-from PyQt5.QtCore import Qt, QAbstractTableModel, QVariant
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
 
 
 class MeasureModel(QAbstractTableModel):
@@ -9,10 +9,27 @@ class MeasureModel(QAbstractTableModel):
         self._data = list()
 
     def update(self, header, data):
-        self.beginResetModel()
-        self._header = header
-        self._data = data
-        self.endResetModel()
+        if header != self._header or len(data) < len(self._data):
+            self.beginResetModel()
+            self._header = header
+            self._data = list(data)
+            self.endResetModel()
+            return
+
+        # same layout: append new rows, notify views only about the cells that changed
+        rows = len(self._data)
+        if len(data) > rows:
+            self.beginInsertRows(QModelIndex(), rows, len(data) - 1)
+            self._data.extend(data[rows:])
+            self.endInsertRows()
+
+        for row in range(rows):
+            old = self._data[row]
+            self._data[row] = data[row]
+            for col, value in enumerate(data[row]):
+                if col >= len(old) or old[col] != value:
+                    index = self.index(row, col)
+                    self.dataChanged.emit(index, index, [Qt.DisplayRole])
 
     def headerData(self, section, orientation, role=None):
         if orientation == Qt.Horizontal:
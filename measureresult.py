@@ -1,17 +1,18 @@
+import csv
 import os
 import random
 
-import openpyxl
-import pandas as pd
+import numpy as np
 
-from collections import defaultdict
-from openpyxl.chart import LineChart, Series, Reference
-from openpyxl.chart.axis import ChartLines
-from openpyxl.cell import Cell
 from textwrap import dedent
 
 from forgot_again.file import load_ast_if_exists, pprint_to_file, make_dirs, open_explorer_at
 from forgot_again.string import now_timestamp
+from harmonics import HarmonicSuppression
+from instrumentation import log, profiler
+from onlinestats import OnlineVcoStats
+from pointstore import ColumnTable, SeriesStore
+from vcoanalysis import vco_characteristics
 
 GIGA = 1_000_000_000
 MEGA = 1_000_000
@@ -19,6 +20,23 @@ KILO = 1_000
 MILLI = 1 / 1_000
 
 
+_characteristics_columns = [
+    ('Uп, В', 'u_src'),
+    ('Fмин, МГц', 'f_min'),
+    ('Fмакс, МГц', 'f_max'),
+    ('ΔF, МГц', 'tuning_range'),
+    ('Kгун.мин, МГц/В', 'kvco_min'),
+    ('Kгун.макс, МГц/В', 'kvco_max'),
+    ('Нелин., %', 'linearity'),
+    ('Pмин, дБм', 'p_min'),
+    ('Pмакс, дБм', 'p_max'),
+    ('ΔP, дБ', 'flatness'),
+    ('Iмин, мА', 'i_min'),
+    ('Iмакс, мА', 'i_max'),
+    ('Уход, МГц/В', 'pushing'),
+]
+
+
 class MeasureResult:
     device = 'vco'
     measurement_name = 'tune'
@@ -26,29 +44,92 @@ class MeasureResult:
 
     def __init__(self):
         self._secondaryParams = dict()
-        self._raw = list()
+        self._raw = ColumnTable()
 
         self._report = dict()
 
-        self._processed = list()
-
         self.ready = False
 
-        self.data1 = defaultdict(list)
-        self.data2 = defaultdict(list)
-        self.data3 = defaultdict(list)
-        self.data4 = defaultdict(list)
+        self.data1 = SeriesStore()
+        self.data2 = SeriesStore()
+        self.data3 = SeriesStore()
+        self.data4 = SeriesStore()
 
         self._table_data = list()
         self._table_header = list()
 
+        self.characteristics = dict()
+
+        self._harmonics = dict()
+        self._suppression = HarmonicSuppression()
+        self._harmonics_dirty = False
+        self.suppression = dict()
+
+        self._online = OnlineVcoStats()
+
     def __bool__(self):
         return self.ready
 
     def process(self):
-        self._prepare_table_data()
+        if 'read_f' in self._raw.columns:
+            self._process_sweep()
+        else:
+            self._prepare_table_data()
         self.ready = True
 
+    def _process_sweep(self):
+        self.characteristics = vco_characteristics(
+            self._raw.column('u_src'),
+            self._raw.column('u_control'),
+            self._raw.column('read_f'),
+            self._raw.column('read_p'),
+            self._raw.column('read_i'),
+        )
+
+        if self._harmonics_dirty:
+            self._suppression.set_fundamental(
+                self._raw.column('u_src'),
+                self._raw.column('u_control'),
+                self._raw.column('read_p'),
+            )
+            for order, table in self._harmonics.items():
+                self._suppression.set_harmonic(order, table.column('u_src'), table.column('u_control'), table.column('read_p'))
+            self._harmonics_dirty = False
+
+        self._apply_harmonic_offsets()
+
+    def _apply_harmonic_offsets(self):
+        offsets = {
+            2: self._secondaryParams.get('x2_offset', 0.0),
+            3: self._secondaryParams.get('x3_offset', 0.0),
+        }
+        self.suppression = self._suppression.suppression(offsets)
+
+        # worst (least suppressed) harmonic level per supply voltage
+        u_src = self._raw.column('u_src')
+        columns = list(_characteristics_columns)
+        for order, dbc in self.suppression.items():
+            key = f'x{order}_dbc'
+            self.characteristics[key] = np.array([
+                np.nanmax(dbc[u_src == supply]) if np.isfinite(dbc[u_src == supply]).any() else np.nan
+                for supply in self.characteristics['u_src']
+            ])
+            columns.append((f'Гарм.x{order}, дБн', key))
+
+        self._table_header = [header for header, _ in columns]
+        self._table_data = [
+            [round(float(self.characteristics[key][row]), 2) for _, key in columns]
+            for row in range(len(self.characteristics['u_src']))
+        ]
+
+    def update_offsets(self, params):
+        """Re-apply x2/x3 offsets to a processed sweep, harmonic joins are reused."""
+        if not self.ready or not self.characteristics:
+            return False
+        self.set_secondary_params(params)
+        self._apply_harmonic_offsets()
+        return True
+
     def _process_point(self, data):
         series1 = data['series1']
         series2 = data['series2']
@@ -65,21 +146,18 @@ class MeasureResult:
         y3 = data['y3']
         y4 = data['y4']
 
-        self.data1[series1].append([x1, y1])
-        self.data2[series2].append([x2, y2])
-        self.data3[series3].append([x3, y3])
-        self.data4[series4].append([x4, y4])
-
-        self._processed.append({**data})
+        self.data1.append(series1, x1, y1)
+        self.data2.append(series2, x2, y2)
+        self.data3.append(series3, x3, y3)
+        self.data4.append(series4, x4, y4)
 
     def clear(self):
         self._secondaryParams.clear()
         self._raw.clear()
+        self._online.clear()
 
         self._report.clear()
 
-        self._processed.clear()
-
         self.data1.clear()
         self.data2.clear()
         self.data3.clear()
@@ -87,15 +165,40 @@ class MeasureResult:
 
         # self._table_data.clear()
         self._table_header.clear()
+        self.characteristics = dict()
+
+        self._harmonics.clear()
+        self._suppression.clear()
+        self.suppression = dict()
+        self._harmonics_dirty = False
 
         self.ready = False
 
     def set_secondary_params(self, params):
         self._secondaryParams = dict(**params.params)
 
+    @profiler.timed('add_point')
     def add_point(self, data):
         self._raw.append(data)
         self._process_point(data)
+        if 'read_f' in data:
+            self._online.add(data['u_src'], data['u_control'], data['read_f'], data['read_p'], data['read_i'])
+        self._harmonics_dirty = True
+        return len(self._raw) - 1
+
+    def add_harmonic_point(self, order, data):
+        try:
+            table = self._harmonics[order]
+        except KeyError:
+            table = self._harmonics[order] = ColumnTable()
+        table.append(data)
+        self._harmonics_dirty = True
+
+    def column(self, key):
+        return self._raw.column(key)
+
+    def row(self, index):
+        return self._raw.row(index)
 
     @property
     def report(self):
@@ -107,6 +210,7 @@ class MeasureResult:
         if not os.path.isfile(table_file):
             return
 
+        import openpyxl
         wb = openpyxl.load_workbook(table_file)
         ws = wb.active
 
@@ -132,20 +236,96 @@ class MeasureResult:
             return mean
         return round(random.randint(0, int((stop - start) / step)) * step + start, 2)
 
+    @profiler.timed('export.xlsx')
+    def export_excel(self, explore=True):
+        # openpyxl is only needed here, keep it out of headless startup
+        import openpyxl
+        from openpyxl.chart import Reference
+        from openpyxl.utils import get_column_letter
+
+        make_dirs(self.path)
+        file_name = f'./{self.path}/{self.device}-{self.measurement_name}-{now_timestamp()}.xlsx'
+
+        # write-only workbook streams rows to disk, memory stays flat with row count
+        wb = openpyxl.Workbook(write_only=True)
+
+        ws = wb.create_sheet('data')
+        columns = self._raw.columns
+        ws.append(columns)
+        for row in _chunked_rows([self._raw.column(c) for c in columns], len(self._raw)):
+            ws.append(row)
+
+        for n, data in enumerate([self.data1, self.data2, self.data3, self.data4], start=1):
+            labels = [k for k in data.keys() if k != '']
+            if not labels:
+                continue
+
+            # x/y column pair per series, series of an adaptive sweep don't share an x grid
+            ws = wb.create_sheet(f'plot{n}')
+            series = [_ordered(*data[k]) for k in labels]
+            rows = max(len(xs) for xs, _ in series)
+            ws.append([title for k in labels for title in ('x', str(k))])
+            for row in _chunked_rows([col for xs, ys in series for col in (xs, ys)], rows):
+                ws.append(row)
+
+            _add_chart(
+                ws,
+                xs=[Reference(ws, min_col=2 * i + 1, min_row=2, max_row=len(xs) + 1) for i, (xs, _) in enumerate(series)],
+                ys=[Reference(ws, min_col=2 * i + 2, min_row=2, max_row=len(xs) + 1) for i, (xs, _) in enumerate(series)],
+                title=f'plot{n}',
+                loc=f'{get_column_letter(2 * len(labels) + 2)}2',
+                curve_labels=[str(k) for k in labels],
+            )
+
+        if self.suppression:
+            ws = wb.create_sheet('harmonics')
+            orders = sorted(self.suppression)
+            ws.append(['u_src', 'u_control', *(f'x{order}, dBc' for order in orders)])
+            columns = [self._raw.column('u_src'), self._raw.column('u_control'), *(self.suppression[o] for o in orders)]
+            for row in _chunked_rows(columns, len(self._raw)):
+                ws.append(row)
+
+        wb.save(file_name)
+
+        full_path = os.path.abspath(file_name)
+        if explore:
+            open_explorer_at(full_path)
+        return full_path
+
+    @profiler.timed('export.csv')
+    def export_csv(self, explore=True):
+        make_dirs(self.path)
+        file_name = f'./{self.path}/{self.device}-{self.measurement_name}-{now_timestamp()}.csv'
+
+        columns = self._raw.columns
+        with open(file_name, mode='wt', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f, delimiter=';')
+            writer.writerow(columns)
+            writer.writerows(_chunked_rows([self._raw.column(c) for c in columns], len(self._raw)))
+
+        full_path = os.path.abspath(file_name)
+        if explore:
+            open_explorer_at(full_path)
+        return full_path
+
+    def get_live_table_data(self):
+        return list(self._online.header), self._online.rows()
+
     def get_result_table_data(self):
-        print(self._table_header)
-        print(self._table_data)
+        log.debug('result table: %s %s', self._table_header, self._table_data)
         return list(self._table_header), list(self._table_data)
 
 
 def _add_chart(ws, xs, ys, title, loc, curve_labels=None, ax_titles=None):
-    chart = LineChart()
+    from openpyxl.chart import ScatterChart, Series
+    from openpyxl.chart.axis import ChartLines
 
-    for y, label in zip(ys, curve_labels):
-        ser = Series(y, title=label)
-        chart.append(ser)
+    # scatter with lines: every curve is plotted against its own x column
+    chart = ScatterChart()
+
+    for x, y, label in zip(xs, ys, curve_labels):
+        chart.series.append(Series(y, x, title=label))
 
-    chart.set_categories(xs)
     chart.title = title
 
     chart.x_axis.minorGridlines = ChartLines()
@@ -159,5 +339,21 @@ def _add_chart(ws, xs, ys, title, loc, curve_labels=None, ax_titles=None):
     ws.add_chart(chart, loc)
 
 
-def _find_deltas(harm, origin):
-    return [[main['u_control'], -(main['p_out'] - harm[1])] for harm, main in zip(harm, origin)]
+def _ordered(xs, ys):
+    # adaptive sweeps fill a series out of order, the chart joins the points in row order
+    if len(xs) > 1 and np.any(np.diff(xs) < 0):
+        order = np.argsort(xs, kind='stable')
+        return xs[order], ys[order]
+    return xs, ys
+
+
+def _chunked_rows(columns, rows, chunk=4096):
+    # convert column views to python values a chunk at a time instead of materializing all rows
+    for start in range(0, rows, chunk):
+        stop = min(start + chunk, rows)
+        yield from zip(*[_padded_slice(col, start, stop) for col in columns])
+
+
+def _padded_slice(col, start, stop):
+    part = [None if v != v else v for v in col[start:stop].tolist()]   # NaN is not a valid cell value
+    return part + [None] * (stop - start - len(part))
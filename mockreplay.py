@@ -0,0 +1,343 @@
+import random
+import re
+import time
+
+from pathlib import Path
+
+import numpy as np
+
+from instr import instrumentfactory
+from instr.agilente3644a import AgilentE3644A
+from instr.agilentn9030a import AgilentN9030A
+from instr.instrumentfactory import SourceFactory, AnalyzerFactory
+from fakevisa import FakeVisaResource
+from recordingloader import load_recording
+from scpitransport import make_block
+
+MEGA = 1_000_000
+MILLI = 1 / 1_000
+
+DEFAULT_RECORDING = './mock_data/4.7-5.0-5.3.txt'
+HARMONIC_RECORDING = './mock_data/x{order}_{index}.txt'
+
+
+class Recording:
+    """
+    Recorded VCO sweep indexed by (u_src, u_control).
+    Lookups between recorded steps are linearly interpolated along u_control,
+    then across the bracketing u_src series.
+    """
+    fields = ['read_f', 'read_p', 'read_i']
+
+    def __init__(self, data):
+        self._index = {
+            (round(u_src, 6), round(u_control, 6)): i
+            for i, (u_src, u_control) in enumerate(zip(data['u_src'].tolist(), data['u_control'].tolist()))
+        }
+        self._data = data
+
+        self.u_srcs = np.unique(data['u_src'])
+        self._series = dict()
+        for u_src in self.u_srcs:
+            rows = data[data['u_src'] == u_src]
+            rows = rows[np.argsort(rows['u_control'], kind='stable')]
+            self._series[u_src] = (
+                np.asarray(rows['u_control']),
+                {f: np.asarray(rows[f]) for f in self.fields},
+            )
+
+    @classmethod
+    def from_file(cls, path):
+        return cls(load_recording(path))
+
+    def lookup(self, u_src, u_control):
+        try:
+            index = self._index[(round(u_src, 6), round(u_control, 6))]
+            return {f: float(self._data[f][index]) for f in self.fields}
+        except KeyError:
+            pass
+
+        right = int(np.clip(np.searchsorted(self.u_srcs, u_src), 0, len(self.u_srcs) - 1))
+        left = max(right - 1, 0)
+        lo = self._interp(self.u_srcs[left], u_control)
+        hi = self._interp(self.u_srcs[right], u_control)
+        if left == right:
+            return lo
+        edges = [self.u_srcs[left], self.u_srcs[right]]
+        return {f: float(np.interp(u_src, edges, [lo[f], hi[f]])) for f in self.fields}
+
+    def _interp(self, u_src, u_control):
+        xs, ys = self._series[u_src]
+        return {f: float(np.interp(u_control, xs, ys[f])) for f in self.fields}
+
+
+class HarmonicRecording:
+    """Recorded harmonic power vs u_control, one recording per supply voltage series."""
+    def __init__(self, series):
+        self.u_srcs = np.array(sorted(series), dtype=float)
+        self._series = dict()
+        for u_src, data in series.items():
+            order = np.argsort(data['u_control'], kind='stable')
+            self._series[u_src] = np.asarray(data['u_control'])[order], np.asarray(data['read_p'])[order]
+
+    @classmethod
+    def from_files(cls, order, u_srcs):
+        # x<order>_<k>.txt is recorded at the k-th supply voltage of the fundamental recording
+        paths = [Path(HARMONIC_RECORDING.format(order=order, index=k)) for k in range(1, len(u_srcs) + 1)]
+        series = {u_src: load_recording(path) for u_src, path in zip(u_srcs, paths) if path.is_file()}
+        return cls(series) if series else None
+
+    def lookup(self, u_src, u_control):
+        nearest = self.u_srcs[np.argmin(np.abs(self.u_srcs - u_src))]
+        xs, ys = self._series[nearest]
+        return float(np.interp(u_control, xs, ys))
+
+
+class ReplayBench:
+    """
+    Shared state of the simulated source/analyzer pair:
+    the source sets voltages, the analyzer answers from the recording at those voltages.
+    Every bus transaction costs `latency` plus uniform `jitter` seconds, seeded for repeatable runs.
+
+    The analyzer only sees peaks inside its current window (CENT/SPAN or STAR/STOP, a degenerate
+    window sees everything). Every marker peak search or trace read is one sweep, its duration
+    is modelled as 2.5 * span / rbw^2 and summed in `sweep_seconds`, slept only with `simulate_sweep`.
+    With continuous sweep off (INIT:CONT OFF) the analyzer sweeps only on INIT:IMM and keeps
+    answering from the source state of that sweep until the next trigger.
+    """
+    noise_floor = -90.0
+
+    def __init__(self, recording, harmonics=None, latency=0.0, jitter=0.0, seed=0, f_unit=MEGA, i_unit=MILLI,
+                 rbw=100e3, simulate_sweep=False):
+        self.recording = recording
+        self.harmonics = harmonics or dict()
+        self.latency = latency
+        self.jitter = jitter
+        self.f_unit = f_unit
+        self.i_unit = i_unit
+
+        self._random = random.Random(seed)
+
+        self.voltages = {1: 0.0, 2: 0.0}
+        self.output = False
+        self.center = None
+        self.span = None
+        self.start = 0.0
+        self.stop = 0.0
+        self.points = 1001
+        self.transactions = 0
+
+        self.rbw = rbw
+        self.simulate_sweep = simulate_sweep
+        self.sweeps = 0
+        self.sweep_seconds = 0.0
+
+        self.continuous = True
+        self._swept = None
+
+    def seed(self, seed):
+        self._random = random.Random(seed)
+
+    def transact(self):
+        self.transactions += 1
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+
+    def reading(self):
+        return self.recording.lookup(self.voltages[1], self.voltages[2])
+
+    def analyzer_voltages(self):
+        # single sweep mode: the held sweep was taken at the source state of its trigger
+        if not self.continuous and self._swept is not None:
+            return self._swept
+        return self.voltages[1], self.voltages[2]
+
+    def analyzer_reading(self):
+        return self.recording.lookup(*self.analyzer_voltages())
+
+    def trigger(self):
+        self._swept = self.voltages[1], self.voltages[2]
+        self.sweep()
+
+    def auto_sweep(self):
+        # marker peak search and trace read sweep by themselves only in continuous mode
+        if self.continuous:
+            self.sweep()
+
+    def window(self):
+        if self.center is not None and self.span:
+            return self.center - self.span / 2, self.center + self.span / 2
+        if self.center is None and self.stop > self.start:
+            return self.start, self.stop
+        return None
+
+    def sweep(self):
+        window = self.window()
+        duration = 2.5 * (window[1] - window[0]) / self.rbw ** 2 if window else 0.0
+        self.sweeps += 1
+        self.sweep_seconds += duration
+        if self.simulate_sweep and duration:
+            time.sleep(duration)
+
+    def visible(self, f):
+        window = self.window()
+        return window is None or window[0] <= f <= window[1]
+
+    def marker_frequency(self):
+        f = self.analyzer_reading()['read_f'] * self.f_unit
+        if self.visible(f):
+            return f
+        # peak outside the window: the marker lands on noise in the middle of the span
+        lo, hi = self.window()
+        return (lo + hi) / 2
+
+    def marker_power(self):
+        # analyzer centred on n * f reads the recorded n-th harmonic
+        reading = self.analyzer_reading()
+        f = reading['read_f'] * self.f_unit
+        if self.center is not None and f:
+            order = round(self.center / f)
+            if order in self.harmonics and self.visible(order * f):
+                return self.harmonics[order].lookup(*self.analyzer_voltages())
+        if not self.visible(f):
+            return self.noise_floor
+        return reading['read_p']
+
+    def trace(self, floor=-90.0, noise=1.0, rbw_bins=3.0):
+        """Synthetic trace over start..stop: noise floor plus fundamental and recorded harmonic peaks."""
+        freqs = np.linspace(self.start, self.stop, self.points)
+        rng = np.random.default_rng(self._random.randrange(2 ** 32))
+        trace = floor + rng.normal(0.0, noise, self.points)
+
+        reading = self.analyzer_reading()
+        f = reading['read_f'] * self.f_unit
+        peaks = {1: reading['read_p']}
+        peaks.update({order: h.lookup(*self.analyzer_voltages()) for order, h in self.harmonics.items()})
+        rbw = max(rbw_bins * (self.stop - self.start) / max(self.points - 1, 1), 1.0)
+        for order, p in peaks.items():
+            # parabolic (in dB) filter shape, 3 dB down at rbw / 2
+            trace = np.maximum(trace, p - 3.0 * ((freqs - order * f) / (rbw / 2)) ** 2)
+        return trace
+
+
+class ReplaySourceMock(FakeVisaResource):
+    """VISA resource stand-in for the power source, channel 1 supplies the VCO, channel 2 drives u_control."""
+    def __init__(self, bench):
+        super().__init__(idn='1,E3648A replay,1')
+        self._bench = bench
+        self._channel = 1
+
+    def _command(self, header, arg):
+        if header == 'INST:SEL':
+            self._channel = int(arg[-1])
+        elif header in ('VOLT', 'VOLTAGE'):
+            self._bench.voltages[self._channel] = _number(arg)
+        elif header in ('OUTP', 'OUTPUT'):
+            self._bench.output = arg.strip().upper() in ('ON', '1')
+        elif header == '*RST':
+            self._bench.voltages = {1: 0.0, 2: 0.0}
+            self._bench.output = False
+            self._channel = 1
+
+    def _answer(self, header, question):
+        if header.startswith('MEAS:CURR'):
+            return self._bench.reading()['read_i'] * self._bench.i_unit if self._bench.output else 0.0
+        return super()._answer(header, question)
+
+    def _transact(self):
+        self._bench.transact()
+
+
+class ReplayAnalyzerMock(FakeVisaResource):
+    """
+    VISA resource stand-in for the spectrum analyzer, marker peak reads the recorded fundamental,
+    TRAC:DATA? returns a synthetic REAL,32 trace with fundamental and harmonic peaks.
+    """
+    def __init__(self, bench):
+        super().__init__(idn='1,N9030A replay,1')
+        self._bench = bench
+
+    def _command(self, header, arg):
+        if header in ('SENS:FREQ:CENT', 'SENSE:FREQUENCY:CENTER', 'SENS:FREQ:RF:CENT'):
+            self._bench.center = _frequency(arg)
+        elif header == 'SENS:FREQ:SPAN':
+            self._bench.span = _frequency(arg)
+        elif header == 'SENS:FREQ:STAR':
+            self._bench.center = None
+            self._bench.start = _frequency(arg)
+        elif header == 'SENS:FREQ:STOP':
+            self._bench.center = None
+            self._bench.stop = _frequency(arg)
+        elif header == 'SENS:SWE:POIN':
+            self._bench.points = int(_number(arg))
+        elif header == 'INIT:CONT':
+            self._bench.continuous = arg.strip().upper() in ('ON', '1')
+        elif header in ('INIT', 'INIT:IMM'):
+            self._bench.trigger()
+        elif header == '*RST':
+            self._bench.center = None
+            self._bench.continuous = True
+        elif re.fullmatch(r'CALC(ULATE)?:MARK(ER)?\d:MAX', header):
+            self._bench.auto_sweep()
+
+    def _answer(self, header, question):
+        if re.fullmatch(r'CALC(ULATE)?:MARK(ER)?\d:X\?', header):
+            return self._bench.marker_frequency()
+        if re.fullmatch(r'CALC(ULATE)?:MARK(ER)?\d:Y\?', header):
+            return self._bench.marker_power()
+        return super()._answer(header, question)
+
+    def _trace_block(self):
+        self._bench.auto_sweep()
+        return make_block(self._bench.trace())
+
+    def _transact(self):
+        self._bench.transact()
+
+
+_bench = None
+
+
+def replay_bench(**options):
+    """
+    Process-wide bench shared by the replay source and analyzer.
+    Keyword options (latency, jitter, seed, rbw, simulate_sweep) update the bench, times in seconds.
+    """
+    global _bench
+    if _bench is None:
+        recording = Recording.from_file(DEFAULT_RECORDING)
+        harmonics = {order: HarmonicRecording.from_files(order, recording.u_srcs) for order in [2, 3]}
+        _bench = ReplayBench(recording, harmonics={k: v for k, v in harmonics.items() if v is not None})
+    for key, value in options.items():
+        if key == 'seed':
+            _bench.seed(value)
+        elif key in ('latency', 'jitter', 'rbw', 'simulate_sweep'):
+            setattr(_bench, key, value)
+        else:
+            raise ValueError(f'Unknown replay bench option {key}.')
+    return _bench
+
+
+class ReplaySourceFactory(SourceFactory):
+    def from_address(self):
+        if instrumentfactory.mock_enabled:
+            return AgilentE3644A(self.addr, '1,E3648A replay,1', ReplaySourceMock(replay_bench()))
+        return super().from_address()
+
+
+class ReplayAnalyzerFactory(AnalyzerFactory):
+    def from_address(self):
+        if instrumentfactory.mock_enabled:
+            return AgilentN9030A(self.addr, '1,N9030A replay,1', ReplayAnalyzerMock(replay_bench()))
+        return super().from_address()
+
+
+def _number(arg):
+    return float(re.match(r'\s*([-+0-9.eE]+)', arg).group(1))
+
+
+def _frequency(arg):
+    units = {'': 1, 'HZ': 1, 'KHZ': 1_000, 'MHZ': MEGA, 'GHZ': 1_000_000_000}
+    value, unit = re.match(r'\s*([-+0-9.eE]+)\s*([a-zA-Z]*)', arg).groups()
+    return float(value) * units[unit.upper()]
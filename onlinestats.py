@@ -0,0 +1,141 @@
+import math
+
+from bisect import bisect_left
+
+
+class RunningStats:
+    """Welford running mean / variance plus min / max, O(1) per value."""
+    __slots__ = ('n', 'mean', 'min', 'max', '_m2')
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.min = math.nan
+        self.max = math.nan
+        self._m2 = 0.0
+
+    def add(self, value):
+        if value != value:
+            return
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (value - self.mean)
+        if self.n == 1:
+            self.min = self.max = value
+        else:
+            self.min = min(self.min, value)
+            self.max = max(self.max, value)
+
+    @property
+    def variance(self):
+        return self._m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class _SeriesStats:
+    def __init__(self):
+        self.f = RunningStats()
+        self.p = RunningStats()
+        self.i = RunningStats()
+        # points sorted by u_control, Kvco is the min / max secant between grid neighbours
+        self._u = list()
+        self._f = list()
+        self._kvco = RunningStats()
+
+    def add(self, u_control, f, p, i):
+        self.f.add(f)
+        self.p.add(p)
+        self.i.add(i)
+        if f == f:
+            self._insert(u_control, f)
+
+    @property
+    def kvco(self):
+        kvco = self._kvco
+        return kvco.min, kvco.max
+
+    def _insert(self, u_control, f):
+        if not self._u or u_control > self._u[-1]:
+            # sweep order: one new secant to the previous point
+            if self._u:
+                self._kvco.add((f - self._f[-1]) / (u_control - self._u[-1]))
+            self._u.append(u_control)
+            self._f.append(f)
+            return
+
+        n = bisect_left(self._u, u_control)
+        if self._u[n] == u_control:
+            return
+        # adaptive refinement point between measured ones replaces the secant it splits, rebuild
+        self._u.insert(n, u_control)
+        self._f.insert(n, f)
+        kvco = RunningStats()
+        for k in range(len(self._u) - 1):
+            kvco.add((self._f[k + 1] - self._f[k]) / (self._u[k + 1] - self._u[k]))
+        self._kvco = kvco
+
+
+class OnlineVcoStats:
+    """
+    Live per supply voltage statistics of a running sweep, updated in O(1) per point while points
+    arrive in u_control order; an adaptive point inserted between measured ones costs an O(n)
+    rebuild of its series Kvco. Reading rows() is O(series).
+    One table row per u_src series in order of appearance.
+    """
+    header = [
+        'Uп, В',
+        'Точек',
+        'Fмин, МГц',
+        'Fмакс, МГц',
+        'ΔF, МГц',
+        'Kгун.мин, МГц/В',
+        'Kгун.макс, МГц/В',
+        'Pср, дБм',
+        'σP, дБ',
+        'Pмин, дБм',
+        'Pмакс, дБм',
+        'Iср, мА',
+        'Iмакс, мА',
+    ]
+
+    def __init__(self):
+        self._series = dict()
+
+    def add(self, u_src, u_control, f, p, i):
+        try:
+            series = self._series[u_src]
+        except KeyError:
+            series = self._series[u_src] = _SeriesStats()
+        series.add(u_control, f, p, i)
+
+    def rows(self):
+        return [
+            [_round(v) for v in [
+                u_src,
+                s.f.n,
+                s.f.min,
+                s.f.max,
+                s.f.max - s.f.min,
+                *s.kvco,
+                s.p.mean,
+                s.p.std,
+                s.p.min,
+                s.p.max,
+                s.i.mean,
+                s.i.max,
+            ]]
+            for u_src, s in list(self._series.items())
+        ]
+
+    def clear(self):
+        self._series.clear()
+
+
+def _round(value):
+    if value != value:
+        return '-'
+    return round(value, 2)
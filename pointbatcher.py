@@ -0,0 +1,57 @@
+import threading
+import time
+
+from collections import deque
+
+
+class PointBatcher:
+    """
+    Throttles per-point notifications from the measure thread to the GUI.
+    New point indices are buffered and handed to `emit` as one list,
+    at most `max_rate` times per second; a buffered point waits no longer than `max_latency` seconds.
+    Batches reach `emit` in point order even when the timer and the measure thread flush at once.
+    """
+    def __init__(self, emit, max_rate=30.0, max_latency=0.1):
+        self._emit = emit
+        self._interval = 1 / max_rate
+        self._max_latency = max_latency
+
+        self._pending = deque()
+        self._lock = threading.Lock()
+        # held from taking a batch to delivering it, so timer and measure thread emit in order
+        self._emit_lock = threading.RLock()
+        self._timer = None
+        self._last = 0.0
+
+    def add(self, index):
+        with self._lock:
+            self._pending.append(index)
+            elapsed = time.monotonic() - self._last
+            if elapsed < self._interval:
+                if self._timer is None:
+                    self._timer = threading.Timer(min(self._interval - elapsed, self._max_latency), self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+        self.flush()
+
+    def flush(self):
+        with self._emit_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                batch = list()
+                while self._pending:
+                    batch.append(self._pending.popleft())
+                if not batch:
+                    return
+                self._last = time.monotonic()
+            self._emit(batch)
+
+    def clear(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._pending.clear()
@@ -0,0 +1,170 @@
+import numpy as np
+
+
+class GrowableArray:
+    """
+    1-D numpy buffer with amortized O(1) append.
+    Capacity doubles on overflow, `view` returns a read-only zero-copy slice of the filled part.
+    """
+    def __init__(self, dtype=float, capacity=64):
+        self._buf = np.empty(capacity, dtype=dtype)
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def append(self, value):
+        if self._len == len(self._buf):
+            self._grow(self._len + 1)
+        try:
+            self._buf[self._len] = value
+        except (TypeError, ValueError):
+            self._promote()
+            self._buf[self._len] = value
+        self._len += 1
+
+    def extend(self, values):
+        values = np.asarray(values)
+        end = self._len + len(values)
+        if end > len(self._buf):
+            self._grow(end)
+        try:
+            self._buf[self._len:end] = values
+        except (TypeError, ValueError):
+            self._promote()
+            self._buf[self._len:end] = values
+        self._len = end
+
+    def clear(self):
+        self._len = 0
+
+    @property
+    def dtype(self):
+        return self._buf.dtype
+
+    @property
+    def view(self):
+        view = self._buf[:self._len]
+        view.flags.writeable = False
+        return view
+
+    def _grow(self, required):
+        buf = np.empty(max(len(self._buf) * 2, required), dtype=self._buf.dtype)
+        buf[:self._len] = self._buf[:self._len]
+        self._buf = buf
+
+    def _promote(self):
+        # mixed-type column (e.g. empty series label after numeric ones), fall back to object storage
+        self._buf = self._buf.astype(object)
+
+
+class SeriesStore:
+    """
+    Insertion-ordered mapping of series key -> (xs, ys) growable columns.
+    Replaces defaultdict(list) of [x, y] pairs, lookups return zero-copy array views.
+    """
+    def __init__(self):
+        self._series = dict()
+
+    def __len__(self):
+        return len(self._series)
+
+    def __bool__(self):
+        return bool(self._series)
+
+    def __iter__(self):
+        return iter(self._series)
+
+    def __contains__(self, key):
+        return key in self._series
+
+    def __getitem__(self, key):
+        return _paired(*self._series[key])
+
+    def append(self, key, x, y):
+        try:
+            xs, ys = self._series[key]
+        except KeyError:
+            xs, ys = self._series[key] = GrowableArray(), GrowableArray()
+        xs.append(x)
+        ys.append(y)
+
+    def keys(self):
+        return self._series.keys()
+
+    def items(self):
+        # snapshot: the measure thread may add a series while the GUI iterates
+        for key, (xs, ys) in list(self._series.items()):
+            yield key, _paired(xs, ys)
+
+    def clear(self):
+        self._series.clear()
+
+
+def _paired(xs, ys):
+    # the writer appends x before y, a reader in between would see one x too many
+    xs, ys = xs.view, ys.view
+    n = min(len(xs), len(ys))
+    return xs[:n], ys[:n]
+
+
+class ColumnTable:
+    """
+    Columnar store for raw point dicts, one growable array per key.
+    Numeric values go to float64 columns, anything else to object columns.
+    """
+    def __init__(self):
+        self._columns = dict()
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def __bool__(self):
+        return self._len > 0
+
+    def __iter__(self):
+        for index in range(self._len):
+            yield self.row(index)
+
+    def append(self, row):
+        for key, value in row.items():
+            try:
+                column = self._columns[key]
+            except KeyError:
+                column = self._columns[key] = self._new_column(value)
+            column.append(value)
+        self._len += 1
+        for column in self._columns.values():
+            if len(column) < self._len:
+                column.append(_fill_value(column.dtype))
+
+    def column(self, key):
+        return self._columns[key].view
+
+    def row(self, index):
+        return {k: v.view[index] for k, v in self._columns.items()}
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    def clear(self):
+        self._columns.clear()
+        self._len = 0
+
+    def _new_column(self, value):
+        column = GrowableArray(dtype=_dtype_for(value))
+        # backfill rows appended before this key first appeared
+        column.extend(np.full(self._len, _fill_value(column.dtype), dtype=column.dtype))
+        return column
+
+
+def _dtype_for(value):
+    if isinstance(value, (int, float, np.number)) and not isinstance(value, bool):
+        return float
+    return object
+
+
+def _fill_value(dtype):
+    return np.nan if dtype.kind == 'f' else None
@@ -1,10 +1,12 @@
-from pathlib import Path
-
-import pandas
+import numpy as np
 import pyqtgraph as pg
 
 from PyQt5.QtWidgets import QGridLayout, QWidget, QLabel
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
+
+from instrumentation import profiler
+from startupprofile import startup
+from tablecache import load_plot_labels
 
 
 # https://www.learnpyqt.com/tutorials/plotting-pyqtgraph/
@@ -13,9 +15,20 @@ from PyQt5.QtCore import Qt
 colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf',
           '#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
 
+# denser curves are drawn as plain downsampled lines, per-point symbols dominate redraw time
+symbol_limit = 1000
+
+sweep_labels = [
+    {'left': 'Fвых, МГц', 'bottom': 'Uупр, В', 'prefix': 'Uп=', 'suffix': ' В'},
+    {'left': 'Pвых, дБм', 'bottom': 'Uупр, В', 'prefix': 'Uп=', 'suffix': ' В'},
+    {'left': 'Iпот, мА', 'bottom': 'Uупр, В', 'prefix': 'Uп=', 'suffix': ' В'},
+    {'left': '', 'bottom': '', 'prefix': '', 'suffix': ''},
+]
+
 
 class PrimaryPlotWidget(QWidget):
     label_style = {'color': 'k', 'font-size': '15px'}
+    frame_interval = 16  # ms, coalesce point bursts into one repaint per frame
 
     def __init__(self, parent=None, controller=None):
         super().__init__(parent)
@@ -25,201 +38,87 @@ class PrimaryPlotWidget(QWidget):
 
         self._grid = QGridLayout()
 
-        self._win = pg.GraphicsLayoutWidget(show=True)
-        self._win.setBackground('w')
-
         self._stat_label = QLabel('Mouse:')
         self._stat_label.setAlignment(Qt.AlignRight)
-
         self._grid.addWidget(self._stat_label, 0, 0)
-        self._grid.addWidget(self._win, 1, 0)
 
-        self._plot_00 = self._win.addPlot(row=0, col=0)
-        self._plot_01 = self._win.addPlot(row=0, col=1)
-        self._plot_10 = self._win.addPlot(row=1, col=0)
-        self._plot_11 = self._win.addPlot(row=1, col=1)
+        self._win = None
 
         self._curves_00 = dict()
         self._curves_01 = dict()
         self._curves_10 = dict()
         self._curves_11 = dict()
 
-        file_name1 = Path('./tables/plot1.xlsx')
-        file_name2 = Path('./tables/plot2.xlsx')
-        file_name3 = Path('./tables/plot3.xlsx')
-        file_name4 = Path('./tables/plot4.xlsx')
-
-        present_1 = file_name1.is_file()
-        present_2 = file_name2.is_file()
-        present_3 = file_name3.is_file()
-        present_4 = file_name4.is_file()
-
-        df1 = pandas.read_excel(file_name1)
-        df2 = pandas.read_excel(file_name2) if present_2 else None
-        df3 = pandas.read_excel(file_name3) if present_3 else None
-        df4 = pandas.read_excel(file_name4) if present_4 else None
-
-        self._labels = [
-            {
-                'left': df1.columns[1] if present_1 else '',
-                'bottom': df1.columns[2] if present_1 else '',
-                'prefix': df1.columns[0].split('#')[0] if present_1 else '',
-                'suffix': df1.columns[0].split('#')[1] if present_1 else '',
-            },            {
-                'left': df2.columns[1] if present_2 else '',
-                'bottom': df2.columns[2] if present_2 else '',
-                'prefix': df2.columns[0].split('#')[0] if present_2 else '',
-                'suffix': df2.columns[0].split('#')[1] if present_2 else '',
-            },
-            {
-                'left': df3.columns[1] if present_3 else '',
-                'bottom': df3.columns[2] if present_3 else '',
-                'prefix': df3.columns[0].split('#')[0] if present_3 else '',
-                'suffix': df3.columns[0].split('#')[1] if present_3 else '',
-            },
-            {
-                'left': df4.columns[1] if present_4 else '',
-                'bottom': df4.columns[2] if present_4 else '',
-                'prefix': df4.columns[0].split('#')[0] if present_4 else '',
-                'suffix': df4.columns[0].split('#')[1] if present_4 else '',
-            },
-        ]
-
-        self._plot_00.setLabel('left', self._labels[0]['left'], **self.label_style)
-        self._plot_00.setLabel('bottom', self._labels[0]['bottom'], **self.label_style)
-        self._plot_00.enableAutoRange('x')
-        self._plot_00.enableAutoRange('y')
-        self._plot_00.showGrid(x=True, y=True)
-        self._vb_00 = self._plot_00.vb
-        rect = self._vb_00.viewRect()
-        self._plot_00.addLegend(offset=(rect.x() + 30, rect.y() + 30))
-        self._vLine_00 = pg.InfiniteLine(angle=90, movable=False)
-        self._hLine_00 = pg.InfiniteLine(angle=0, movable=False)
-        self._plot_00.addItem(self._vLine_00, ignoreBounds=True)
-        self._plot_00.addItem(self._hLine_00, ignoreBounds=True)
-        self._proxy_00 = pg.SignalProxy(self._plot_00.scene().sigMouseMoved, rateLimit=60, slot=self.mouseMoved_00)
-
-        self._plot_01.setLabel('left', self._labels[1]['left'], **self.label_style)
-        self._plot_01.setLabel('bottom', self._labels[1]['bottom'], **self.label_style)
-        self._plot_01.enableAutoRange('x')
-        self._plot_01.enableAutoRange('y')
-        self._plot_01.showGrid(x=True, y=True)
-        self._vb_01 = self._plot_01.vb
-        rect = self._vb_01.viewRect()
-        self._plot_01.addLegend(offset=(rect.x() + rect.width() - 50, rect.y() + 30))
-        self._vLine_01 = pg.InfiniteLine(angle=90, movable=False)
-        self._hLine_01 = pg.InfiniteLine(angle=0, movable=False)
-        self._plot_01.addItem(self._vLine_01, ignoreBounds=True)
-        self._plot_01.addItem(self._hLine_01, ignoreBounds=True)
-        self._proxy_01 = pg.SignalProxy(self._plot_01.scene().sigMouseMoved, rateLimit=60, slot=self.mouseMoved_01)
-
-        self._plot_10.setLabel('left', self._labels[2]['left'], **self.label_style)
-        self._plot_10.setLabel('bottom', self._labels[2]['bottom'], **self.label_style)
-        self._plot_10.enableAutoRange('x')
-        self._plot_10.enableAutoRange('y')
-        self._plot_10.showGrid(x=True, y=True)
-        self._vb_02 = self._plot_10.vb
-        rect = self._vb_02.viewRect()
-        self._plot_10.addLegend(offset=(rect.x() + rect.width() - 50, rect.y() + 30))
-        self._vLine_02 = pg.InfiniteLine(angle=90, movable=False)
-        self._hLine_02 = pg.InfiniteLine(angle=0, movable=False)
-        self._plot_10.addItem(self._vLine_02, ignoreBounds=True)
-        self._plot_10.addItem(self._hLine_02, ignoreBounds=True)
-        self._proxy_02 = pg.SignalProxy(self._plot_10.scene().sigMouseMoved, rateLimit=60, slot=self.mouseMoved_02)
-
-        self._plot_11.setLabel('left', self._labels[3]['left'], **self.label_style)
-        self._plot_11.setLabel('bottom', self._labels[3]['bottom'], **self.label_style)
-        self._plot_11.enableAutoRange('x')
-        self._plot_11.enableAutoRange('y')
-        self._plot_11.showGrid(x=True, y=True)
-        self._vb_12 = self._plot_11.vb
-        rect = self._vb_12.viewRect()
-        self._plot_11.addLegend(offset=(rect.x() + rect.width() - 50, rect.y() + 30))
-        self._vLine_12 = pg.InfiniteLine(angle=90, movable=False)
-        self._hLine_12 = pg.InfiniteLine(angle=0, movable=False)
-        self._plot_11.addItem(self._vLine_12, ignoreBounds=True)
-        self._plot_11.addItem(self._hLine_12, ignoreBounds=True)
-        self._proxy_12 = pg.SignalProxy(self._plot_11.scene().sigMouseMoved, rateLimit=60, slot=self.mouseMoved_12)
-
-        if not present_1:
-            self._plot_01.hide()
-
-        if not present_2:
-            self._plot_01.hide()
-
-        if not present_3:
-            self._plot_10.hide()
-
-        if not present_4:
-            self._plot_11.hide()
+        self._frameTimer = QTimer()
+        self._frameTimer.setSingleShot(True)
+        self._frameTimer.timeout.connect(self._redraw)
 
-        self.setLayout(self._grid)
+        cols1, cols2, cols3, cols4 = load_plot_labels()
 
-    def mouseMoved_00(self, event):
-        pos = event[0]
-        if self._plot_00.sceneBoundingRect().contains(pos):
-            mouse_point = self._vb_00.mapSceneToView(pos)
-            x = mouse_point.x()
-            y = mouse_point.y()
-            self._vLine_00.setPos(x)
-            self._hLine_00.setPos(y)
-            if not self._curves_00:
-                return
-
-            self._stat_label.setText(_label_text(x, y, [
-                [p, curve.yData[_find_value_index(curve.xData, x)]]
-                for p, curve in self._curves_00.items()
-            ]))
+        # no plot tables means the controller sweeps the instruments, plots 1-3 show f, p and i
+        if not cols1:
+            self._labels = sweep_labels
+            self._present = [True, True, True, False]
+        else:
+            self._labels = [_table_labels(cols) for cols in [cols1, cols2, cols3, cols4]]
+            self._present = [bool(cols) for cols in [cols1, cols2, cols3, cols4]]
 
-    def mouseMoved_01(self, event):
-        pos = event[0]
-        if self._plot_01.sceneBoundingRect().contains(pos):
-            mouse_point = self._vb_01.mapSceneToView(pos)
-            x = mouse_point.x()
-            y = mouse_point.y()
-            self._vLine_01.setPos(x)
-            self._hLine_01.setPos(y)
-            if not self._curves_01:
-                return
+        self.setLayout(self._grid)
 
-            self._stat_label.setText(_label_text(x, y, [
-                [p, curve.yData[_find_value_index(curve.xData, x)]]
-                for p, curve in self._curves_01.items()
-            ]))
+    def showEvent(self, event):
+        super().showEvent(event)
+        # plots are built on first show, after the main window got painted
+        if self._win is None:
+            QTimer.singleShot(0, self._build)
 
-    def mouseMoved_02(self, event):
-        pos = event[0]
-        if self._plot_10.sceneBoundingRect().contains(pos):
-            mouse_point = self._vb_02.mapSceneToView(pos)
-            x = mouse_point.x()
-            y = mouse_point.y()
-            self._vLine_02.setPos(x)
-            self._hLine_02.setPos(y)
-            if not self._curves_10:
-                return
+    def _build(self):
+        if self._win is not None:
+            return
 
-            self._stat_label.setText(_label_text(x, y, [
-                [p, curve.yData[_find_value_index(curve.xData, x)]]
-                for p, curve in self._curves_10.items()
-            ]))
+        self._win = pg.GraphicsLayoutWidget(show=True)
+        self._win.setBackground('w')
+        self._grid.addWidget(self._win, 1, 0)
 
-    def mouseMoved_12(self, event):
-        pos = event[0]
-        if self._plot_11.sceneBoundingRect().contains(pos):
-            mouse_point = self._vb_12.mapSceneToView(pos)
-            x = mouse_point.x()
-            y = mouse_point.y()
-            self._vLine_12.setPos(x)
-            self._hLine_12.setPos(y)
-            if not self._curves_11:
-                return
+        self._plot_00 = self._win.addPlot(row=0, col=0)
+        self._plot_01 = self._win.addPlot(row=0, col=1)
+        self._plot_10 = self._win.addPlot(row=1, col=0)
+        self._plot_11 = self._win.addPlot(row=1, col=1)
 
-            self._stat_label.setText(_label_text(x, y, [
-                [p, curve.yData[_find_value_index(curve.xData, x)]]
-                for p, curve in self._curves_11.items()
-            ]))
+        self._cursor_00 = self._setup_plot(self._plot_00, self._labels[0], self._curves_00, legend_right=False)
+        self._cursor_01 = self._setup_plot(self._plot_01, self._labels[1], self._curves_01)
+        self._cursor_10 = self._setup_plot(self._plot_10, self._labels[2], self._curves_10)
+        self._cursor_11 = self._setup_plot(self._plot_11, self._labels[3], self._curves_11)
+
+        for plot, present in zip([self._plot_00, self._plot_01, self._plot_10, self._plot_11], self._present):
+            if not present:
+                plot.hide()
+
+        self._redraw()
+        startup.mark('plots')
+
+    def _setup_plot(self, plot, labels, curves, legend_right=True):
+        plot.setLabel('left', labels['left'], **self.label_style)
+        plot.setLabel('bottom', labels['bottom'], **self.label_style)
+        plot.enableAutoRange('x')
+        plot.enableAutoRange('y')
+        plot.showGrid(x=True, y=True)
+        rect = plot.vb.viewRect()
+        if legend_right:
+            plot.addLegend(offset=(rect.x() + rect.width() - 50, rect.y() + 30))
+        else:
+            plot.addLegend(offset=(rect.x() + 30, rect.y() + 30))
+        return PlotCursor(plot, curves, self._stat_label)
 
     def clear(self):
+        self._frameTimer.stop()
+        if self._win is None:
+            return
+
+        self._cursor_00.clear()
+        self._cursor_01.clear()
+        self._cursor_10.clear()
+        self._cursor_11.clear()
+
         def _remove_curves(plot, curve_dict):
             for _, curve in curve_dict.items():
                 plot.removeItem(curve)
@@ -235,42 +134,124 @@ class PrimaryPlotWidget(QWidget):
         self._curves_11.clear()
 
     def plot(self):
-        print('plotting primary stats')
+        profiler.count('plot.requests')
+        if not self._frameTimer.isActive():
+            self._frameTimer.start(self.frame_interval)
+
+    @profiler.timed('plot.redraw')
+    def _redraw(self):
+        if self._win is None:
+            return
         _plot_curves(self._controller.result.data1, self._curves_00, self._plot_00, prefix=self._labels[0]['prefix'], suffix=self._labels[0]['suffix'])
         _plot_curves(self._controller.result.data2, self._curves_01, self._plot_01, prefix=self._labels[1]['prefix'], suffix=self._labels[1]['suffix'])
         _plot_curves(self._controller.result.data3, self._curves_10, self._plot_10, prefix=self._labels[2]['prefix'], suffix=self._labels[2]['suffix'])
         _plot_curves(self._controller.result.data4, self._curves_11, self._plot_11, prefix=self._labels[3]['prefix'], suffix=self._labels[3]['suffix'])
 
 
+def _table_labels(columns):
+    # plot table header: 'prefix#suffix' series column, then y and x columns
+    if not columns:
+        return {'left': '', 'bottom': '', 'prefix': '', 'suffix': ''}
+    prefix, _, suffix = columns[0].partition('#')
+    return {'left': columns[1], 'bottom': columns[2], 'prefix': prefix, 'suffix': suffix}
+
+
 def _plot_curves(datas, curves, plot, prefix='', suffix=''):
-    for pow_lo, data in datas.items():
-        curve_xs, curve_ys = zip(*data)
+    for pow_lo, (curve_xs, curve_ys) in datas.items():
         try:
-            curves[pow_lo].setData(x=curve_xs, y=curve_ys)
+            curve = curves[pow_lo]
+            # series buffers only grow during a sweep, skip curves that got no new samples
+            if curve.xData is None or len(curve.xData) != len(curve_xs):
+                if len(curve_xs) > symbol_limit and curve.opts['symbol'] is not None:
+                    curve.setSymbol(None)
+                curve.setData(*_ordered(curve_xs, curve_ys))
         except KeyError:
             try:
                 color = colors[len(curves)]
             except IndexError:
                 color = colors[len(curves) - len(colors)]
             curves[pow_lo] = pg.PlotDataItem(
-                curve_xs,
-                curve_ys,
+                *_ordered(curve_xs, curve_ys),
                 pen=pg.mkPen(
                     color=color,
                     width=2,
                 ),
-                symbol='o',
+                symbol='o' if len(curve_xs) <= symbol_limit else None,
                 symbolSize=5,
                 symbolBrush=color,
+                autoDownsample=True,
                 name=f'{prefix}{pow_lo}{suffix}'
             )
             plot.addItem(curves[pow_lo])
 
 
+def _ordered(xs, ys):
+    # adaptive sweeps fill a series out of order, draw it sorted by x
+    if len(xs) > 1 and np.any(np.diff(xs) < 0):
+        order = np.argsort(xs, kind='stable')
+        return xs[order], ys[order]
+    return xs, ys
+
+
+class PlotCursor:
+    """
+    Crosshair with a nearest-sample readout for every curve on the plot.
+    Sorted x-index per curve is cached until the curve gets new data.
+    """
+    def __init__(self, plot, curves, label):
+        self._plot = plot
+        self._curves = curves
+        self._label = label
+
+        self._index = dict()
+
+        self._vLine = pg.InfiniteLine(angle=90, movable=False)
+        self._hLine = pg.InfiniteLine(angle=0, movable=False)
+        self._plot.addItem(self._vLine, ignoreBounds=True)
+        self._plot.addItem(self._hLine, ignoreBounds=True)
+        self._proxy = pg.SignalProxy(self._plot.scene().sigMouseMoved, rateLimit=60, slot=self.mouseMoved)
+
+    def mouseMoved(self, event):
+        pos = event[0]
+        if self._plot.sceneBoundingRect().contains(pos):
+            mouse_point = self._plot.vb.mapSceneToView(pos)
+            x = mouse_point.x()
+            y = mouse_point.y()
+            self._vLine.setPos(x)
+            self._hLine.setPos(y)
+            if not self._curves:
+                return
+
+            self._label.setText(_label_text(x, y, [
+                [p, curve.yData[_find_value_index(*self._sorted_index(curve), x)]]
+                for p, curve in self._curves.items()
+            ]))
+
+    def clear(self):
+        self._index.clear()
+
+    def _sorted_index(self, curve):
+        xs = curve.xData
+        try:
+            cached_xs, sorted_xs, order = self._index[curve]
+            # setData replaces xData, identity check is enough to detect stale index
+            if cached_xs is xs:
+                return sorted_xs, order
+        except KeyError:
+            pass
+        order = np.argsort(xs, kind='stable')
+        sorted_xs = xs[order]
+        self._index[curve] = xs, sorted_xs, order
+        return sorted_xs, order
+
+
 def _label_text(x, y, vals):
     vals_str = ''.join(f'   <span style="color:{colors[i]}">{p:0.1f}={v:0.2f}</span>' for i, (p, v) in enumerate(vals))
     return f"<span style='font-size: 8pt'>x={x:0.2f},   y={y:0.2f}   {vals_str}</span>"
 
 
-def _find_value_index(freqs: list, freq):
-    return min(range(len(freqs)), key=lambda i: abs(freqs[i] - freq))
+def _find_value_index(sorted_xs, order, x):
+    right = min(np.searchsorted(sorted_xs, x), len(sorted_xs) - 1)
+    left = max(right - 1, 0)
+    nearest = left if abs(x - sorted_xs[left]) <= abs(sorted_xs[right] - x) else right
+    return order[nearest]
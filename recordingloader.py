@@ -0,0 +1,72 @@
+import ast
+import hashlib
+import os
+import re
+
+from pathlib import Path
+
+import numpy as np
+
+_pair = re.compile(r"'(\w+)'\s*:\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)")
+
+
+def load_recording(path):
+    """
+    Load a mock_data recording (Python literal list of flat numeric dicts) as a structured numpy array.
+    Parsed data is cached as <name>.<hash>.npy next to the source and opened memory-mapped,
+    so repeated loads take milliseconds and the pages are shared between processes.
+    """
+    path = Path(path)
+    raw = path.read_bytes()
+    digest = hashlib.sha1(raw).hexdigest()[:16]
+    cache = path.with_name(f'{path.name}.{digest}.npy')
+
+    if cache.is_file():
+        try:
+            return np.load(cache, mmap_mode='r')
+        except (OSError, ValueError) as ex:
+            print(f'error reading recording cache {cache}:', ex)
+
+    data = _parse(raw.decode('utf-8'))
+
+    try:
+        for stale in path.parent.glob(f'{path.name}.*.npy'):
+            if stale != cache:
+                stale.unlink(missing_ok=True)
+        # write aside and rename, other processes never map a half-written cache
+        tmp_path = cache.with_name(f'{cache.name}.{os.getpid()}.tmp')
+        with open(tmp_path, mode='wb') as f:
+            np.save(f, data)
+        os.replace(tmp_path, cache)
+        return np.load(cache, mmap_mode='r')
+    except (OSError, ValueError) as ex:
+        print(f'error writing recording cache {cache}:', ex)
+        return data
+
+
+def _parse(text):
+    pairs = _pair.findall(text)
+    if not pairs:
+        return np.zeros(0, dtype=[])
+
+    # every record has the same keys in the same order, so the flat pair list reshapes into columns
+    keys = list(dict.fromkeys(k for k, _ in pairs))
+    if len(pairs) % len(keys) or any(k != keys[i % len(keys)] for i, (k, _) in enumerate(pairs)):
+        return _parse_literal(text)
+
+    values = np.array([v for _, v in pairs], dtype=float).reshape(-1, len(keys))
+    data = np.empty(len(values), dtype=[(k, float) for k in keys])
+    for i, k in enumerate(keys):
+        data[k] = values[:, i]
+    return data
+
+
+def _parse_literal(text):
+    # slow path for irregular recordings
+    points = ast.literal_eval(text)
+    keys = list(dict.fromkeys(k for p in points for k in p))
+    data = np.full(len(points), np.nan, dtype=[(k, float) for k in keys])
+    for i, p in enumerate(points):
+        for k, v in p.items():
+            data[k][i] = v
+    return data
@@ -21,3 +21,6 @@ class ResultTableWidget(QWidget):
 
     def updateResult(self):
         self._model.update(*self._result.get_result_table_data())
+
+    def updateLive(self):
+        self._model.update(*self._result.get_live_table_data())
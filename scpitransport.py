@@ -0,0 +1,96 @@
+import threading
+
+from contextlib import contextmanager
+
+import numpy as np
+
+from instrumentation import profiler
+
+
+class ScpiTransport:
+    """
+    Command pipelining on top of an instr driver (anything with send/query).
+    Queued commands go out as one semicolon-joined write, flushed before
+    the next query or on batch exit, so N setup commands cost one bus round-trip.
+
+    Pipeline stages on different threads may share one instrument: every call, and a whole
+    batch, holds the transport lock, so a write/read pair is never split by another thread.
+    """
+    def __init__(self, instrument, max_length=512):
+        self._instrument = instrument
+        # binary block reads need the underlying VISA resource, drivers only expose text I/O
+        self._resource = getattr(instrument, '_inst', instrument)
+        self._max_length = max_length
+
+        self._lock = threading.RLock()
+        self._queue = list()
+        self.round_trips = 0
+
+    def __str__(self):
+        return f'{self._instrument}'
+
+    def send(self, command):
+        with self._lock:
+            # flush before the joined write would outgrow the instrument input buffer
+            if self._queue and sum(len(c) + 2 for c in self._queue) + len(command) + 1 > self._max_length:
+                self.flush()
+            self._queue.append(command)
+
+    def flush(self):
+        with self._lock:
+            if not self._queue:
+                return
+            with profiler.timer('scpi.send'):
+                self._instrument.send(_join(self._queue))
+            self._queue.clear()
+            self.round_trips += 1
+
+    def query(self, question):
+        with self._lock:
+            self.flush()
+            self.round_trips += 1
+            with profiler.timer('scpi.query'):
+                return self._instrument.query(question)
+
+    def query_many(self, questions):
+        """Answer several queries with a single write/read pair."""
+        return [a.strip() for a in self.query(_join(questions)).split(';')]
+
+    def fetch_trace(self, trace=1):
+        """Read the whole analyzer trace as a REAL,32 definite-length block instead of per-marker queries."""
+        with self._lock:
+            self.flush()
+            with profiler.timer('scpi.trace'):
+                self._resource.write(_join([':FORM REAL,32', ':FORM:BORD SWAP', f':TRAC:DATA? TRACE{trace}']))
+                data = self._resource.read_raw()
+            self.round_trips += 1
+        return parse_block(data)
+
+    @contextmanager
+    def batch(self):
+        with self._lock:
+            try:
+                yield self
+            finally:
+                self.flush()
+
+
+def parse_block(data, dtype='<f4'):
+    """Decode an IEEE 488.2 definite-length binary block (#<n><length><payload>)."""
+    if data[:1] != b'#':
+        raise ValueError('Not a definite-length binary block.')
+    digits = int(data[1:2])
+    length = int(data[2:2 + digits])
+    start = 2 + digits
+    return np.frombuffer(data[start:start + length], dtype=dtype)
+
+
+def make_block(values, dtype='<f4'):
+    payload = np.asarray(values, dtype=dtype).tobytes()
+    length = str(len(payload))
+    return f'#{len(length)}{length}'.encode() + payload + b'\n'
+
+
+def _join(commands):
+    # ';:' resets the SCPI header path, so each command is parsed from the root
+    return ';'.join(c if c.startswith((':', '*')) else f':{c}' for c in commands)
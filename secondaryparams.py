@@ -9,9 +9,7 @@ class SecondaryParams:
     @property
     def params(self):
         if self._params is None:
-            self._params = {
-                k: v[1]['value'] for k, v in self._required.items()
-            }
+            self._params = self.defaults
         return self._params
 
     @params.setter
@@ -22,5 +20,10 @@ class SecondaryParams:
     def required(self):
         return dict(**self._required)
 
+    @property
+    def defaults(self):
+        return {k: v[1]['value'] for k, v in self._required.items()}
+
     def load_from_config(self, file):
-        self.params = load_ast_if_exists(file, default=self.params)
+        # configs saved before a param was added lack its key, it gets the default value
+        self.params = {**self.defaults, **load_ast_if_exists(file, default=self.params)}
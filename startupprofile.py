@@ -0,0 +1,27 @@
+import time
+
+
+class StartupProfile:
+    """Wall time of application startup phases, each mark() closes the phase started by the previous one."""
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._last = self._start
+        self.phases = list()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    @property
+    def total(self):
+        return self._last - self._start
+
+    def report(self):
+        print('startup profile:')
+        for phase, elapsed in self.phases:
+            print(f'  {phase:<20} {elapsed * 1000:8.1f} ms')
+        print(f'  {"total":<20} {self.total * 1000:8.1f} ms')
+
+
+startup = StartupProfile()
@@ -0,0 +1,165 @@
+import multiprocessing
+import queue
+import time
+
+from forgot_again.file import load_ast_if_exists
+
+from measureresult import MeasureResult
+
+
+class StationManager:
+    """
+    Runs one headless MeasureCore + LotRunner per bench station, each in its own process
+    with its own instrument addresses, params file, device list and archive directory.
+
+    Workers stream measured points, finished units and summaries back over one queue;
+    poll() folds them into `results` (current unit MeasureResult per station) and `units`,
+    so a single view can follow every station.
+    """
+    def __init__(self, stations, mock=False):
+        self._stations = stations
+        self._mock = mock
+        self._ctx = multiprocessing.get_context('spawn')
+        self._queue = self._ctx.Queue()
+        self._stop = self._ctx.Event()
+        self._processes = dict()
+
+        self.results = {s['name']: MeasureResult() for s in stations}
+        self.units = list()
+        self.status = {s['name']: 'idle' for s in stations}
+        self._started = 0.0
+        self._elapsed = 0.0
+
+    @classmethod
+    def from_config(cls, path='stations.ini', mock=False):
+        return cls(load_ast_if_exists(path, default=list()), mock=mock)
+
+    def start(self):
+        self._stop.clear()
+        self._started = time.perf_counter()
+        for station in self._stations:
+            process = self._ctx.Process(
+                target=_station_worker,
+                args=(station, self._mock, self._queue, self._stop),
+                name=station['name'],
+                daemon=True,
+            )
+            process.start()
+            self._processes[station['name']] = process
+            self.status[station['name']] = 'starting'
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self):
+        return any(p.is_alive() for p in self._processes.values())
+
+    def poll(self, timeout=0.0):
+        """Apply all queued worker messages, returns names of stations that got updates."""
+        updated = set()
+        while True:
+            try:
+                kind, name, payload = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            timeout = 0.0
+            updated.add(name)
+            if kind == 'start':
+                self.results[name] = MeasureResult()
+                self.results[name].device = payload
+                self.status[name] = f'measuring {payload}'
+            elif kind == 'points':
+                for point in payload:
+                    self.results[name].add_point(point)
+            elif kind == 'unit':
+                self.units.append({'station': name, **payload})
+            elif kind == 'done':
+                self.status[name] = 'done'
+            elif kind == 'error':
+                self.status[name] = f'error: {payload}'
+        if self._started:
+            self._elapsed = time.perf_counter() - self._started
+        return updated
+
+    def join(self, interval=0.1):
+        while self.running:
+            self.poll(timeout=interval)
+        for process in self._processes.values():
+            process.join()
+        self.poll()
+
+    def summary(self):
+        done = [u for u in self.units if 'error' not in u]
+        return {
+            'stations': len(self._stations),
+            'units': len(done),
+            'failed': len(self.units) - len(done),
+            'elapsed': round(self._elapsed, 2),
+            'units_per_hour': round(len(done) / self._elapsed * 3600, 1) if self._elapsed else 0.0,
+        }
+
+
+class _StopToken:
+    def __init__(self, event):
+        self._event = event
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+
+def _station_worker(station, mock, channel, stop):
+    # runs in a spawned process: imports, instrument sessions and mock bench are per station
+    import logging
+
+    from instrumentation import setup_logging
+    setup_logging(logging.WARNING)
+
+    if mock:
+        from instr import instrumentfactory
+        from mockreplay import replay_bench
+        instrumentfactory.mock_enabled = True
+        # optional per-station bench options, e.g. {'latency': 0.01, 'jitter': 0.002}
+        replay_bench(**station.get('mock', dict()))
+
+    from lotrunner import LotRunner
+    from measurearchive import MeasureArchive
+    from measurecore import MeasureCore
+
+    name = station['name']
+    try:
+        core = MeasureCore()
+        core.secondaryParams.load_from_config(station.get('params', 'params.ini'))
+        core.archive = MeasureArchive(f'archive/{name}')
+        core.dwellMode = station.get('dwell_mode', 'auto')
+        core.connect(station.get('instr', dict()))
+        if not core.found:
+            channel.put(('error', name, 'instruments not found'))
+            return
+
+        current = [None]
+
+        def on_points(indices):
+            result = core.result
+            if result is not current[0]:
+                current[0] = result
+                channel.put(('start', name, result.device))
+            channel.put(('points', name, [_plain(result.row(i)) for i in indices]))
+
+        core.subscribe(on_points)
+
+        runner = LotRunner(
+            core,
+            devices=station.get('devices'),
+            matrix=station.get('matrix'),
+            export=station.get('export', 'xlsx'),
+            on_unit=lambda unit: channel.put(('unit', name, unit)),
+        )
+        channel.put(('done', name, runner.run(_StopToken(stop))))
+    except Exception as ex:
+        channel.put(('error', name, str(ex)))
+
+
+def _plain(point):
+    return {k: v.item() if hasattr(v, 'item') else v for k, v in point.items()}
@@ -0,0 +1,119 @@
+import queue
+import threading
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, ex):
+        self.ex = ex
+
+
+class PipelinedSweep:
+    """
+    Runs a sweep as a source -> analyzer pipeline, each instrument on its own worker thread.
+
+    Stages:
+        - program(step): set up the source for the step and let it settle
+        - capture(step): take the measurement that needs the step's source state, returns a handle
+        - readout(step, handle): transfer / decode the captured data, returns the point;
+          runs while the source is already on the next step, so it must not depend on its state
+
+    The source programs step n + 1 as soon as step n is captured, so its settling overlaps
+    the readout of step n. Queues are bounded, points come out strictly in step order,
+    cancellation is checked through the CancelToken on every stage.
+    """
+    poll = 0.05
+
+    def __init__(self, program, capture, readout=None, depth=2):
+        self._program = program
+        self._capture = capture
+        self._readout = readout or (lambda step, handle: handle)
+        self._depth = depth
+
+    def run(self, steps, token):
+        stop = threading.Event()
+        programmed = queue.Queue(maxsize=1)
+        results = queue.Queue(maxsize=self._depth)
+        captured = threading.Semaphore(0)
+
+        source = threading.Thread(target=self._source_worker, args=(steps, programmed, captured, results, stop), daemon=True)
+        analyzer = threading.Thread(target=self._analyzer_worker, args=(programmed, captured, results, stop), daemon=True)
+        source.start()
+        analyzer.start()
+
+        try:
+            while True:
+                if token.cancelled:
+                    raise RuntimeError('measurement cancelled')
+                try:
+                    item = results.get(timeout=self.poll)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    return
+                if isinstance(item, _Failure):
+                    raise item.ex
+                yield item
+        finally:
+            stop.set()
+            source.join()
+            analyzer.join()
+
+    def _source_worker(self, steps, programmed, captured, results, stop):
+        try:
+            for step in steps:
+                if stop.is_set():
+                    return
+                self._program(step)
+                if not _put(programmed, step, stop):
+                    return
+                # don't touch the source until the analyzer has captured this step
+                while not captured.acquire(timeout=self.poll):
+                    if stop.is_set():
+                        return
+            _put(programmed, _DONE, stop)
+        except Exception as ex:
+            _put(results, _Failure(ex), stop)
+
+    def _analyzer_worker(self, programmed, captured, results, stop):
+        try:
+            while not stop.is_set():
+                try:
+                    step = programmed.get(timeout=self.poll)
+                except queue.Empty:
+                    continue
+                if step is _DONE:
+                    _put(results, _DONE, stop)
+                    return
+                handle = self._capture(step)
+                captured.release()
+                if not _put(results, self._readout(step, handle), stop):
+                    return
+        except Exception as ex:
+            _put(results, _Failure(ex), stop)
+
+
+def _put(q, item, stop):
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=PipelinedSweep.poll)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+class SerialSweep:
+    """Same stages as PipelinedSweep run one after another on the calling thread, the baseline it is measured against."""
+    def __init__(self, program, capture, readout=None):
+        self._program = program
+        self._capture = capture
+        self._readout = readout or (lambda step, handle: handle)
+
+    def run(self, steps, token):
+        for step in steps:
+            if token.cancelled:
+                raise RuntimeError('measurement cancelled')
+            self._program(step)
+            yield self._readout(step, self._capture(step))
@@ -0,0 +1,71 @@
+import numpy as np
+
+from adaptivesweep import AdaptiveSweep
+
+# one analyzer sweep at the current source state with :INIT:CONT OFF, *OPC? answers when it is complete
+SINGLE_SWEEP = ':INIT:IMM;*OPC?'
+
+
+def sweep_plan(secondary):
+    """(steps, adaptive) of the tuning sweep: (u_src, u_control) pairs and the AdaptiveSweep refining them, or None."""
+    # non-zero tolerances switch the uniform grid to coarse-to-fine refinement
+    if secondary.get('adapt_f_tol', 0) > 0 or secondary.get('adapt_p_tol', 0) > 0:
+        adaptive = _adaptive_plan(secondary)
+        return adaptive.initial(), adaptive
+    return _uniform_plan(secondary), None
+
+
+def harmonic_orders(secondary):
+    # harmonic_order is the highest harmonic measured: 1 - none, 2 - x2, 3 - x2 and x3
+    return list(range(2, int(secondary['harmonic_order']) + 1))
+
+
+def _uniform_plan(secondary):
+    u_controls = _grid(secondary['u_vco_min'], secondary['u_vco_max'], secondary['u_vco_delta'])
+    return [(u_src, u_control) for u_src in _supplies(secondary) for u_control in u_controls]
+
+
+def _adaptive_plan(secondary):
+    return AdaptiveSweep(
+        _supplies(secondary),
+        _grid(secondary['u_vco_min'], secondary['u_vco_max'], secondary['u_vco_delta']),
+        f_tol=secondary['adapt_f_tol'],
+        p_tol=secondary['adapt_p_tol'],
+    )
+
+
+def _supplies(secondary):
+    return [secondary[k] for k in ['u_src_drift_1', 'u_src_drift_2', 'u_src_drift_3'] if secondary[k] > 0]
+
+
+def _grid(start, stop, step):
+    if step <= 0 or stop <= start:
+        return [start]
+    return np.round(np.arange(start, stop + step / 2, step), 6).tolist()
+
+
+def sweep_point(u_src, u_control, read_f, read_p, read_i):
+    # measured values plus the series/x/y fields the four plots are fed from
+    return {
+        'u_src': u_src,
+        'u_control': u_control,
+        'read_f': read_f,
+        'read_p': read_p,
+        'read_i': read_i,
+
+        'series1': u_src,
+        'x1': u_control,
+        'y1': read_f,
+
+        'series2': u_src,
+        'x2': u_control,
+        'y2': read_p,
+
+        'series3': u_src,
+        'x3': u_control,
+        'y3': read_i,
+
+        'series4': '',
+        'x4': 0,
+        'y4': 0,
+    }
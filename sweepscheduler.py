@@ -0,0 +1,90 @@
+import time
+
+from instrumentation import log
+
+
+class SweepScheduler:
+    """
+    Per-step dwell policy for the sweep loop.
+
+    Modes:
+        - 'fixed': wait the settle time after each step
+        - 'replay': no dwell at all, for replaying recorded or tabulated data
+        - 'opc': poll instrument *OPC? until it reports ready, settle time is the upper bound
+
+    Keeps per-point timings, so sweep time can be split into dwell and everything else.
+    """
+    modes = ['fixed', 'replay', 'opc']
+
+    def __init__(self, settle=0.0, mode='fixed', instrument=None, poll_interval=0.005):
+        if mode not in self.modes:
+            raise ValueError(f'Unknown dwell mode {mode}.')
+        if mode == 'opc' and instrument is None:
+            raise ValueError('OPC dwell mode needs an instrument to poll.')
+
+        self._settle = settle
+        self._mode = mode
+        self._instrument = instrument
+        self._poll_interval = poll_interval
+
+        self._last = 0.0
+        self.point_times = list()
+        self.dwell_times = list()
+
+    def start(self):
+        self.point_times.clear()
+        self.dwell_times.clear()
+        self._last = time.perf_counter()
+
+    def settle(self, token=None):
+        start = time.perf_counter()
+        if self._mode == 'fixed':
+            _sleep(self._settle, token)
+        elif self._mode == 'opc':
+            self._wait_opc(token)
+        self.dwell_times.append(time.perf_counter() - start)
+
+    def mark(self):
+        now = time.perf_counter()
+        self.point_times.append(now - self._last)
+        self._last = now
+
+    def summary(self):
+        points = len(self.point_times)
+        if not points:
+            return {'points': 0}
+        total = sum(self.point_times)
+        dwell = sum(self.dwell_times)
+        return {
+            'points': points,
+            'total': total,
+            'per_point': total / points,
+            'max_point': max(self.point_times),
+            'dwell_per_point': dwell / points,
+            'dwell_share': dwell / total if total else 0.0,
+        }
+
+    def _wait_opc(self, token):
+        deadline = time.perf_counter() + self._settle
+        while True:
+            if token is not None and token.cancelled:
+                return
+            try:
+                if int(float(self._instrument.query('*OPC?'))) == 1:
+                    return
+            except ValueError:
+                pass
+            if time.perf_counter() >= deadline:
+                log.warning('*OPC? timeout after %s s', self._settle)
+                return
+            time.sleep(self._poll_interval)
+
+
+def _sleep(duration, token=None, step=0.05):
+    # sleep in short slices so cancel doesn't have to wait out a long dwell
+    deadline = time.perf_counter() + duration
+    while True:
+        left = deadline - time.perf_counter()
+        if left <= 0 or (token is not None and token.cancelled):
+            return
+        time.sleep(min(left, step))
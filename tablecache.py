@@ -0,0 +1,189 @@
+import os
+import threading
+import zipfile
+
+from pathlib import Path
+
+import numpy as np
+
+from forgot_again.file import load_ast_if_exists, pprint_to_file
+
+PLOT_TABLES = [
+    Path('./tables/plot1.xlsx'),
+    Path('./tables/plot2.xlsx'),
+    Path('./tables/plot3.xlsx'),
+    Path('./tables/plot4.xlsx'),
+]
+PLOT_LABELS = Path('./tables/labels.ini')
+
+
+class Table:
+    """
+    Immutable column snapshot of a source workbook.
+    Columns are read-only numpy arrays, safe to share between the controller and GUI threads.
+    """
+    def __init__(self, columns=(), arrays=()):
+        self.columns = tuple(columns)
+        self._arrays = tuple(arrays)
+        for arr in self._arrays:
+            arr.flags.writeable = False
+
+    def __len__(self):
+        return len(self._arrays[0]) if self._arrays else 0
+
+    def __getitem__(self, key):
+        return self._arrays[self.columns.index(key)]
+
+    @property
+    def empty(self):
+        return not self.columns
+
+    def column(self, index):
+        return self._arrays[index]
+
+    def to_frame(self):
+        import pandas
+        return pandas.DataFrame({c: arr for c, arr in zip(self.columns, self._arrays)})
+
+
+class TableCache:
+    """
+    Parses each workbook once per (path, mtime, size) key.
+    With `sidecar` enabled parsed columns are also stored in a .npz next to the workbook,
+    so warm starts skip Excel parsing entirely.
+    """
+    def __init__(self, sidecar=True):
+        self._sidecar = sidecar
+        self._tables = dict()
+        self._lock = threading.Lock()
+
+    def load(self, path):
+        path = Path(path)
+        if not path.is_file():
+            return Table()
+
+        stat = path.stat()
+        full_path = str(path.resolve())
+        key = (full_path, stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            try:
+                return self._tables[key]
+            except KeyError:
+                pass
+
+            table = self._load_sidecar(path, key) if self._sidecar else None
+            if table is None:
+                table = _parse(path)
+                if self._sidecar:
+                    self._save_sidecar(path, key, table)
+
+            self._tables = {k: v for k, v in self._tables.items() if k[0] != full_path}
+            self._tables[key] = table
+            return table
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+
+    def _load_sidecar(self, path, key):
+        sidecar = _sidecar_path(path)
+        if not sidecar.is_file():
+            return None
+        try:
+            with np.load(sidecar, allow_pickle=False) as npz:
+                if tuple(npz['__key__']) != key[1:]:
+                    return None
+                columns = [str(c) for c in npz['__columns__']]
+                return Table(columns, [npz[f'c{i}'] for i in range(len(columns))])
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile) as ex:
+            # truncated or empty sidecar: parse the workbook again and rewrite it
+            print(f'error reading table sidecar {sidecar}:', ex)
+            return None
+
+    def _save_sidecar(self, path, key, table):
+        sidecar = _sidecar_path(path)
+        arrays = {f'c{i}': table.column(i) for i in range(len(table.columns))}
+        # write aside and rename, a crash mid-write never leaves a broken sidecar behind
+        tmp_path = sidecar.with_name(f'{sidecar.name}.{os.getpid()}.tmp')
+        try:
+            with open(tmp_path, mode='wb') as f:
+                np.savez(f, __key__=np.array(key[1:]), __columns__=np.array(table.columns, dtype=str), **arrays)
+            os.replace(tmp_path, sidecar)
+        except OSError as ex:
+            print(f'error writing table sidecar {sidecar}:', ex)
+
+
+def _parse(path):
+    # pandas costs a second of import time, only pay it on a sidecar miss
+    import pandas
+    df = pandas.read_excel(path)
+    arrays = list()
+    for col in df.columns:
+        arr = df[col].to_numpy()
+        if arr.dtype == object:
+            # keep sidecar loadable without pickle
+            arr = arr.astype(str)
+        arrays.append(arr)
+    return Table([str(c) for c in df.columns], arrays)
+
+
+def _sidecar_path(path):
+    return path.with_name(f'{path.name}.npz')
+
+
+table_cache = TableCache()
+
+
+def load_plot_tables():
+    return [table_cache.load(path) for path in PLOT_TABLES]
+
+
+def load_plot_labels():
+    """
+    Column headers of every plot table, [] for a missing table.
+    Headers are kept in a small labels.ini keyed by workbook mtime and size,
+    so the plot widget gets its axis labels without touching the workbooks.
+    """
+    cached = load_ast_if_exists(str(PLOT_LABELS), default=dict())
+    labels = dict()
+    for path in PLOT_TABLES:
+        if not path.is_file():
+            continue
+        stat = path.stat()
+        key = [stat.st_mtime_ns, stat.st_size]
+        entry = cached.get(path.name)
+        if entry is None or entry['key'] != key:
+            entry = {'key': key, 'columns': list(table_cache.load(path).columns)}
+        labels[path.name] = entry
+
+    if labels != cached and PLOT_LABELS.parent.is_dir():
+        try:
+            pprint_to_file(str(PLOT_LABELS), labels)
+        except OSError as ex:
+            print(f'error writing plot labels {PLOT_LABELS}:', ex)
+
+    return [labels[path.name]['columns'] if path.name in labels else [] for path in PLOT_TABLES]
+
+
+def aligned_columns(tables):
+    """
+    Series/x/y columns of every plot table as arrays aligned to the first table.
+    Missing tables give '' series and zero values, shorter tables are zero-padded.
+    """
+    rows = len(tables[0])
+    columns = dict()
+    for n, table in enumerate(tables, start=1):
+        for key, index, empty in [('series', 0, ''), ('x', 1, 0), ('y', 2, 0)]:
+            columns[f'{key}{n}'] = _padded(table, index, rows, empty)
+    return columns
+
+
+def _padded(table, index, rows, empty):
+    if table.empty:
+        return np.full(rows, empty, dtype=object if isinstance(empty, str) else float)
+    arr = table.column(index)[:rows]
+    if len(arr) == rows:
+        return arr
+    dtype = object if arr.dtype.kind in 'US' else arr.dtype
+    return np.concatenate([arr.astype(dtype), np.zeros(rows - len(arr), dtype=dtype)])
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+
+from types import SimpleNamespace
+
+import pytest
+
+from asyncengine import AsyncSweep
+from fakevisa import FakeVisaResource
+from measureresult import MeasureResult
+from scpitransport import ScpiTransport
+from sweepplan import SINGLE_SWEEP
+
+SECONDARY = {
+    'i_src_max': 50.0,
+    'sa_min': 1.0,
+    'sa_max': 2.0,
+    'sa_rlev': 10.0,
+    'sa_span': 50.0,
+    'dwell': 10.0,
+    'harmonic_order': 2.0,
+}
+
+
+class _Driver:
+    def __init__(self, inst):
+        self._inst = inst
+
+    def send(self, command):
+        return self._inst.write(command)
+
+    def query(self, question):
+        return self._inst.query(question)
+
+
+def _core(analyzer, dwell_mode='replay'):
+    # the parts of MeasureCore AsyncSweep uses, without importing the instrument drivers
+    result = MeasureResult()
+    points = list()
+
+    def add_measure_point(point):
+        points.append(point)
+        result.add_point(point)
+
+    return SimpleNamespace(
+        _transports={
+            'Источник': ScpiTransport(_Driver(FakeVisaResource())),
+            'Анализатор': ScpiTransport(_Driver(analyzer)),
+        },
+        _dwell_mode=lambda tabulated=False: dwell_mode,
+        _add_measure_point=add_measure_point,
+        _add_harmonic_point=result.add_harmonic_point,
+        result=result,
+        points=points,
+    )
+
+
+def _analyzer(opc='1'):
+    return FakeVisaResource(responses={':CALC:MARK1:X?': '1500000000', ':CALC:MARK1:Y?': '-5', '*OPC?': opc})
+
+
+def _run(core, token, steps, secondary=SECONDARY, **kwargs):
+    return asyncio.run(AsyncSweep(core, **kwargs).run(token, secondary, (steps, None)))
+
+
+def test_markers_read_from_a_single_sweep():
+    analyzer = _analyzer()
+    core = _core(analyzer)
+
+    _run(core, SimpleNamespace(cancelled=False), [(5.0, 0.0), (5.0, 1.0)])
+
+    log = analyzer.log
+    assert ':INIT:CONT OFF' in log[0]
+    assert log[-1] == ':INIT:CONT ON'
+    # every marker search follows a completed sweep: 2 tuning points, 2 harmonic points
+    maxima = [n for n, command in enumerate(log) if 'CALC:MARK1:MAX' in command]
+    assert len(maxima) == 4
+    assert all(SINGLE_SWEEP in ''.join(log[n - 1:n + 1]) for n in maxima)
+    assert [p['read_f'] for p in core.points] == [1500.0, 1500.0]
+
+
+def test_hung_query_times_out():
+    def hang(question):
+        time.sleep(0.5)
+        return '1'
+
+    core = _core(_analyzer(opc=hang))
+
+    start = time.perf_counter()
+    with pytest.raises(RuntimeError, match='no answer in 0.1 s'):
+        _run(core, SimpleNamespace(cancelled=False), [(5.0, 0.0)], timeout=0.1)
+    assert time.perf_counter() - start < 1.5
+
+
+def test_cancel_interrupts_the_dwell():
+    token = SimpleNamespace(cancelled=False)
+    core = _core(_analyzer(), dwell_mode='fixed')
+    threading.Timer(0.1, setattr, [token, 'cancelled', True]).start()
+
+    start = time.perf_counter()
+    with pytest.raises(RuntimeError, match='cancelled'):
+        _run(core, token, [(5.0, 0.0), (5.0, 1.0)], secondary={**SECONDARY, 'dwell': 10000.0})
+    assert time.perf_counter() - start < 1.0
+    assert core.points == []
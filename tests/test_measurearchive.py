@@ -0,0 +1,58 @@
+import ast
+
+import numpy as np
+
+import measurearchive
+
+from measurearchive import MeasureArchive
+
+
+def test_run_keeps_harmonic_rows_apart(tmp_path):
+    archive = MeasureArchive(tmp_path)
+    archive.chunk_size = 4
+    run = archive.begin('A1462-01', {'dwell': 10.0})
+    for n in range(10):
+        run.add({'u_src': 5.0, 'u_control': float(n), 'read_f': 9000.0 + n, 'label': 'x'})
+    for order in [2, 3]:
+        for n in range(5):
+            run.add_harmonic(order, {'u_src': 5.0, 'u_control': float(n), 'read_p': -order * 10.0})
+    run.flush()
+
+    points = archive.load(run.run)
+    assert points.dtype.names == ('u_src', 'u_control', 'read_f')
+    np.testing.assert_array_equal(points['read_f'], 9000.0 + np.arange(10))
+    for order in [2, 3]:
+        rows = archive.load(run.run, harmonic=order)
+        np.testing.assert_array_equal(rows['u_control'], np.arange(5.0))
+        np.testing.assert_array_equal(rows['read_p'], [-order * 10.0] * 5)
+    assert len(MeasureArchive(tmp_path).load(run.run, harmonic=2)) == 5
+
+
+def test_index_is_parsed_once(tmp_path, monkeypatch):
+    parsed = list()
+    original = ast.literal_eval
+
+    def literal_eval(line):
+        # np.load parses .npy headers with it too
+        if "'run'" in line:
+            parsed.append(line)
+        return original(line)
+
+    monkeypatch.setattr(measurearchive.ast, 'literal_eval', literal_eval)
+
+    archive = MeasureArchive(tmp_path)
+    run = archive.begin('A1462-01', {'dwell': 10.0})
+    run.add({'u_src': 5.0, 'read_f': 9000.0})
+    run.flush()
+    for _ in range(3):
+        assert [r['run'] for r in archive.runs()] == [run.run]
+        archive.load(run.run)
+    # own appends go straight into the parsed index
+    assert parsed == []
+
+    # another writer on the same directory, e.g. a second station process
+    other = MeasureArchive(tmp_path).begin('A1462-02', {'dwell': 10.0})
+    parsed.clear()
+    assert [r['device'] for r in archive.runs()] == ['A1462-01', 'A1462-02']
+    assert [r['run'] for r in archive.runs(device='A1462-02')] == [other.run]
+    assert len(parsed) == 1
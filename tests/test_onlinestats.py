@@ -0,0 +1,44 @@
+import numpy as np
+
+from onlinestats import OnlineVcoStats
+
+
+def _kvco_range(points):
+    us, fs = np.array(sorted(points)).T
+    secants = np.diff(fs) / np.diff(us)
+    return round(secants.min(), 2), round(secants.max(), 2)
+
+
+def test_kvco_from_grid_neighbours_in_any_order():
+    rng = np.random.default_rng(0)
+    u = np.round(rng.uniform(0.0, 10.0, 50), 3)
+    f = 9000.0 + 300 * u - 20 * u ** 2
+
+    stats = OnlineVcoStats()
+    # coarse pass first, then refinement points landing between measured ones
+    for n in [*range(0, 50, 5), *(n for n in range(50) if n % 5)]:
+        stats.add(5.0, u[n], f[n], 0.0, 30.0)
+
+    row = dict(zip(stats.header, stats.rows()[0]))
+    assert (row['Kгун.мин, МГц/В'], row['Kгун.макс, МГц/В']) == _kvco_range(zip(u, f))
+
+
+def test_kvco_skips_repeated_voltage_and_missed_points():
+    stats = OnlineVcoStats()
+    for u, f in [(0.0, 100.0), (1.0, 200.0), (1.0, 900.0), (2.0, float('nan')), (3.0, 250.0)]:
+        stats.add(5.0, u, f, 0.0, 30.0)
+
+    row = dict(zip(stats.header, stats.rows()[0]))
+    assert (row['Kгун.мин, МГц/В'], row['Kгун.макс, МГц/В']) == (25.0, 100.0)
+
+
+def test_kvco_in_sweep_order_matches_rebuild():
+    u = np.linspace(0.0, 10.0, 40)
+    f = 9000.0 + 300 * u - 20 * u ** 2
+
+    stats = OnlineVcoStats()
+    for n in range(40):
+        stats.add(5.0, u[n], f[n], 0.0, 30.0)
+
+    row = dict(zip(stats.header, stats.rows()[0]))
+    assert (row['Kгун.мин, МГц/В'], row['Kгун.макс, МГц/В']) == _kvco_range(zip(u, f))
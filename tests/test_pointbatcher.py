@@ -0,0 +1,27 @@
+import threading
+
+from pointbatcher import PointBatcher
+
+
+def test_timer_batch_is_delivered_before_a_later_flush():
+    delivered = list()
+    in_timer = threading.Event()
+    release = threading.Event()
+
+    def emit(batch):
+        if threading.current_thread() is not threading.main_thread():
+            # timer thread took its batch, hold it until the caller has flushed a newer one
+            in_timer.set()
+            release.wait(timeout=1.0)
+        delivered.extend(batch)
+
+    batcher = PointBatcher(emit, max_rate=1.0, max_latency=0.01)
+    batcher.add(0)
+    batcher.add(1)
+    assert in_timer.wait(timeout=1.0)
+
+    batcher.add(2)
+    threading.Timer(0.05, release.set).start()
+    batcher.flush()
+
+    assert delivered == [0, 1, 2]
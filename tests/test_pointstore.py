@@ -0,0 +1,16 @@
+import numpy as np
+
+from pointstore import SeriesStore
+
+
+def test_series_views_are_paired_mid_append():
+    store = SeriesStore()
+    for n in range(5):
+        store.append(4.7, float(n), 10.0 * n)
+    # measure thread between the x and the y append
+    xs, ys = store._series[4.7]
+    xs.append(5.0)
+
+    for got_xs, got_ys in [store[4.7], dict(store.items())[4.7]]:
+        np.testing.assert_array_equal(got_xs, [0.0, 1.0, 2.0, 3.0, 4.0])
+        np.testing.assert_array_equal(got_ys, [0.0, 10.0, 20.0, 30.0, 40.0])
@@ -0,0 +1,122 @@
+import threading
+
+import numpy as np
+import pytest
+
+from fakevisa import FakeVisaResource
+from scpitransport import ScpiTransport, make_block, parse_block
+
+
+class _Driver:
+    """instr-style driver: text I/O through the VISA resource kept in `_inst`."""
+    def __init__(self, inst):
+        self._inst = inst
+
+    def send(self, command):
+        return self._inst.write(command)
+
+    def query(self, question):
+        return self._inst.query(question)
+
+
+def _transport(**kwargs):
+    resource = FakeVisaResource(**kwargs)
+    return ScpiTransport(_Driver(resource)), resource
+
+
+def test_batch_joins_sends_into_one_write():
+    transport, resource = _transport()
+    with transport.batch():
+        for n in range(10):
+            transport.send(f'VOLT {n}V')
+        assert resource.writes == 0
+
+    assert resource.writes == 1
+    assert resource.reads == 0
+    assert transport.round_trips == 1
+    assert resource.log == [';'.join(f':VOLT {n}V' for n in range(10))]
+
+
+def test_send_flushes_when_write_gets_too_long():
+    resource = FakeVisaResource()
+    transport = ScpiTransport(_Driver(resource), max_length=40)
+    for n in range(10):
+        transport.send(f'VOLT {n}V')
+    transport.flush()
+
+    assert resource.writes == 3
+    assert all(len(write) <= 40 for write in resource.log)
+    assert ';'.join(resource.log) == ';'.join(f':VOLT {n}V' for n in range(10))
+
+
+def test_query_flushes_queued_commands_first():
+    transport, resource = _transport()
+    transport.send('INST:SEL OUTP1')
+    transport.send('VOLT 5V')
+    assert transport.query('*OPC?') == '1'
+
+    assert resource.log == [':INST:SEL OUTP1;:VOLT 5V', '*OPC?']
+    assert (resource.writes, resource.reads) == (2, 1)
+    assert transport.round_trips == 2
+
+
+def test_query_many_is_one_write_read_pair():
+    transport, resource = _transport(responses={
+        'CALC:MARK1:X?': '1.2e+10',
+        'CALC:MARK1:Y?': lambda question: '-7.5',
+    })
+    assert transport.query_many([':CALC:MARK1:X?', ':CALC:MARK1:Y?', '*OPC?']) == ['1.2e+10', '-7.5', '1']
+    assert (resource.writes, resource.reads) == (1, 1)
+
+
+def test_fetch_trace_reads_binary_block():
+    trace = np.linspace(-90.0, 0.0, 10001)
+    transport, resource = _transport(trace=trace)
+    transport.send(':SENS:FREQ:STAR 1GHz')
+
+    data = transport.fetch_trace()
+
+    np.testing.assert_array_equal(data, trace.astype('<f4'))
+    # queued setup write, then one block write / read_raw pair
+    assert (resource.writes, resource.reads) == (2, 1)
+    assert resource.log[-1] == ':FORM REAL,32;:FORM:BORD SWAP;:TRAC:DATA? TRACE1'
+    assert transport.round_trips == 2
+
+
+def test_threads_sharing_a_transport_get_their_own_answers():
+    # source stage polling *OPC? while the analyzer stage reads the marker
+    transport, _ = _transport(latency=0.001, responses={
+        'CALC:MARK1:X?': '1.2e+10',
+        'CALC:MARK1:Y?': '-7.5',
+    })
+    answers = {'opc': list(), 'marker': list()}
+
+    def poll():
+        for _ in range(50):
+            answers['opc'].append(transport.query('*OPC?'))
+
+    def marker():
+        for _ in range(50):
+            transport.send(':CALC:MARK1:MAX')
+            answers['marker'].append(transport.query_many([':CALC:MARK1:X?', ':CALC:MARK1:Y?']))
+
+    threads = [threading.Thread(target=poll), threading.Thread(target=marker)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert answers['opc'] == ['1'] * 50
+    assert answers['marker'] == [['1.2e+10', '-7.5']] * 50
+
+
+def test_parse_block_round_trip():
+    values = np.arange(12345, dtype='<f4')
+    block = make_block(values)
+    assert block.startswith(b'#549380')
+    np.testing.assert_array_equal(parse_block(block), values)
+
+
+def test_parse_block_rejects_text():
+    with pytest.raises(ValueError):
+        parse_block(b'-12.5\n')
@@ -0,0 +1,93 @@
+import random
+import threading
+import time
+
+from types import SimpleNamespace
+
+import pytest
+
+from sweepexecutor import PipelinedSweep, SerialSweep
+
+
+def _token():
+    # measurecore.CancelToken without importing the instrument drivers
+    return SimpleNamespace(cancelled=False)
+
+
+def _jitter(rng, lock):
+    with lock:
+        delay = rng.uniform(0.0, 0.003)
+    time.sleep(delay)
+
+
+def test_points_come_out_in_step_order():
+    rng, lock = random.Random(0), threading.Lock()
+    programmed = list()
+
+    def program(step):
+        _jitter(rng, lock)
+        programmed.append(step)
+
+    def capture(step):
+        _jitter(rng, lock)
+        return step * 10
+
+    def readout(step, handle):
+        _jitter(rng, lock)
+        return step, handle
+
+    steps = list(range(100))
+    points = list(PipelinedSweep(program, capture, readout).run(steps, _token()))
+
+    assert points == [(n, n * 10) for n in steps]
+    assert programmed == steps
+    assert points == list(SerialSweep(program, capture, readout).run(steps, _token()))
+
+
+def test_readout_overlaps_programming_the_next_step():
+    def program(step):
+        time.sleep(0.02)
+
+    def readout(step, handle):
+        time.sleep(0.02)
+        return step
+
+    start = time.perf_counter()
+    list(PipelinedSweep(program, lambda step: None, readout).run(range(20), _token()))
+    # serial would be 20 * 40 ms
+    assert time.perf_counter() - start < 0.65
+
+
+def test_cancel_stops_both_stages():
+    token = _token()
+    programmed = list()
+
+    def program(step):
+        programmed.append(step)
+        time.sleep(0.005)
+
+    points = list()
+    with pytest.raises(RuntimeError, match='cancelled'):
+        for point in PipelinedSweep(program, lambda step: step).run(range(1000), token):
+            points.append(point)
+            if len(points) == 5:
+                token.cancelled = True
+
+    # run() joins the workers before raising, nothing is programmed afterwards
+    stopped = len(programmed)
+    time.sleep(0.05)
+    assert len(programmed) == stopped < 10
+    assert points == list(range(5))
+
+
+def test_stage_failure_is_raised_in_the_caller():
+    def capture(step):
+        if step == 3:
+            raise ValueError('bad reading')
+        return step
+
+    points = list()
+    with pytest.raises(ValueError, match='bad reading'):
+        for point in PipelinedSweep(lambda step: None, capture).run(range(10), _token()):
+            points.append(point)
+    assert points == [0, 1, 2]
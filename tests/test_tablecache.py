@@ -0,0 +1,32 @@
+import numpy as np
+import pandas
+import pytest
+
+from tablecache import TableCache, _sidecar_path
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / 'plot1.xlsx'
+    pandas.DataFrame({'x': [0.0, 1.0, 2.0], '4.7': [9595.0, 10015.0, 10448.5]}).to_excel(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize('damage', [lambda data: data[:len(data) // 2], lambda data: b''])
+def test_broken_sidecar_falls_back_to_the_workbook(workbook, damage):
+    TableCache().load(workbook)
+    sidecar = _sidecar_path(workbook)
+    sidecar.write_bytes(damage(sidecar.read_bytes()))
+
+    table = TableCache().load(workbook)
+
+    assert table.columns == ('x', '4.7')
+    np.testing.assert_array_equal(table['4.7'], [9595.0, 10015.0, 10448.5])
+    # rewritten in full, the next cold start reads it again
+    assert TableCache()._load_sidecar(workbook, (None, *_key(workbook))) is not None
+    assert sorted(p.name for p in workbook.parent.iterdir()) == ['plot1.xlsx', 'plot1.xlsx.npz']
+
+
+def _key(path):
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,43 @@
+import numpy as np
+
+from traceacquisition import SpanTracker, find_peaks
+
+
+def _trace(start, stop, peaks, n=10001):
+    freqs = np.linspace(start, stop, n)
+    trace = np.full(n, -90.0)
+    for f, p in peaks:
+        trace = np.maximum(trace, p - 3.0 * ((freqs - f) / 2e6) ** 2)
+    return trace
+
+
+def test_fundamental_searched_around_the_guess():
+    # x2 stronger than the fundamental wins a global argmax
+    trace = _trace(9e9, 31e9, [(10e9, -10.0), (20e9, 0.0), (30e9, -20.0)])
+    peaks = find_peaks(trace, 9e9, 31e9, f_guess=10.2e9, search=500e6, tolerance=50e6)
+
+    assert abs(peaks[1][0] - 10e9) < 1e6
+    assert abs(peaks[2][0] - 20e9) < 2e6
+    assert abs(peaks[3][0] - 30e9) < 3e6
+
+
+def test_missed_steps_widen_up_to_the_default_window():
+    tracker = SpanTracker(9e9, 13e9, 50e6)
+    for u, f in [(0.0, 9.6e9), (1.0, 10.0e9), (2.0, 10.4e9)]:
+        tracker.add(5.0, u, f)
+
+    f_guess, half, default = tracker.search(5.0, 3.0)
+    assert not default and abs(f_guess - 10.8e9) < 1e6
+
+    halves = list()
+    while not default:
+        tracker.miss((5.0, 3.0))
+        assert tracker.retry() == [(5.0, 3.0)]
+        halves.append(half)
+        f_guess, half, default = tracker.search(5.0, 3.0)
+    assert halves == sorted(halves) and half == 2.05e9
+    assert tracker.next_window(5.0, 3.0)[:2] == (9e9 - 50e6, 39e9 + 50e6)
+
+    # a clean pass drops the widening
+    assert tracker.retry() is None
+    assert tracker.search(5.0, 3.0)[1:] == (halves[0], False)
@@ -0,0 +1,47 @@
+import numpy as np
+
+from vcoanalysis import vco_characteristics
+
+
+def _sweep(seed=0):
+    rng = np.random.default_rng(seed)
+    u_src, u_control = list(), list()
+    for supply, points in [(4.7, 40), (5.0, 25), (5.3, 60)]:
+        # uneven grids, as an adaptive sweep leaves them
+        grid = np.unique(np.round(rng.uniform(0.0, 10.0, points), 3))
+        u_src.extend([supply] * len(grid))
+        u_control.extend(grid)
+    u_src, u_control = np.array(u_src), np.array(u_control)
+    f = 9000.0 + 300 * u_control + 4 * u_control ** 2 + 50 * u_src
+    p = -5.0 + np.sin(u_control)
+    i = 30.0 + u_src
+    shuffle = rng.permutation(len(u_src))
+    return u_src[shuffle], u_control[shuffle], f[shuffle], p[shuffle], i[shuffle]
+
+
+def test_kvco_matches_per_series_gradient():
+    u_src, u_control, f, p, i = _sweep()
+    result = vco_characteristics(u_src, u_control, f, p, i)
+
+    kvco = result['kvco']
+    ordered_src = u_src[result['order']]
+    for n, supply in enumerate(result['u_src']):
+        mask = u_src == supply
+        order = np.argsort(u_control[mask])
+        expected = np.gradient(f[mask][order], u_control[mask][order])
+        np.testing.assert_allclose(kvco[ordered_src == supply], expected, rtol=1e-9)
+        assert result['kvco_min'][n] == expected.min()
+        assert result['kvco_max'][n] == expected.max()
+
+
+def test_ranges_per_series():
+    u_src, u_control, f, p, i = _sweep(seed=1)
+    result = vco_characteristics(u_src, u_control, f, p, i)
+
+    for n, supply in enumerate(result['u_src']):
+        mask = u_src == supply
+        assert result['f_min'][n] == f[mask].min()
+        assert result['f_max'][n] == f[mask].max()
+        assert result['tuning_range'][n] == f[mask].max() - f[mask].min()
+        assert result['flatness'][n] == p[mask].max() - p[mask].min()
+        assert result['i_max'][n] == i[mask].max()
@@ -0,0 +1,189 @@
+import numpy as np
+
+TRACE_POINTS = 10001
+PEAK_RANGE = 70.0  # dB below reference level, weaker marker peaks count as missed
+
+
+def find_peaks(trace, start, stop, orders=(1, 2, 3), f_guess=None, tolerance=None, search=None):
+    """
+    Fundamental and harmonic peaks of one analyzer trace.
+
+    The fundamental is the strongest bin (within `search` Hz of `f_guess` when given, `tolerance` by default), every
+    harmonic order n is the strongest bin within n * tolerance of n * f. Peaks are refined by
+    parabolic interpolation over the neighbouring bins, all orders in one vectorized pass.
+    Returns {order: (f, p)} in Hz / dBm, NaN for orders outside the trace.
+    """
+    trace = np.asarray(trace, dtype=float)
+    n = len(trace)
+    step = (stop - start) / (n - 1)
+    tolerance = tolerance or 5 * step
+    search = search or tolerance
+
+    if f_guess is None:
+        first = int(np.argmax(trace))
+    else:
+        lo, hi = _bins(f_guess - search, f_guess + search, start, step, n)
+        first = lo + int(np.argmax(trace[lo:hi])) if hi > lo else int(np.argmax(trace))
+    f1, _ = _refine(trace, np.array([first]), start, step)
+    f1 = f1[0]
+
+    orders = np.asarray(orders)
+    width = max(1, int(np.ceil(tolerance / step)))
+    centers = np.rint((orders * f1 - start) / step).astype(int)
+    halves = width * orders
+    offsets = np.arange(-halves.max(), halves.max() + 1)
+    index = centers[:, None] + offsets[None, :]
+    valid = (np.abs(offsets)[None, :] <= halves[:, None]) & (index >= 0) & (index < n)
+
+    windows = np.where(valid, trace[np.clip(index, 0, n - 1)], -np.inf)
+    peaks = index[np.arange(len(orders)), np.argmax(windows, axis=1)]
+    inside = valid.any(axis=1) & (centers >= 0) & (centers < n)
+
+    fs, ps = _refine(trace, np.clip(peaks, 0, n - 1), start, step)
+    fs[~inside] = np.nan
+    ps[~inside] = np.nan
+    return {int(o): (float(f), float(p)) for o, f, p in zip(orders, fs, ps)}
+
+
+class TuningPredictor:
+    """
+    Running fit of the tuning curve f(u_control) for every supply series, updated as points arrive.
+
+    The next frequency comes from a quadratic through the last `depth` points of the series
+    (linear with two points). Until a series has two points it borrows the nearest series
+    measured so far at the same u_control. Uncertainty is the spread between the quadratic and
+    linear extrapolations, so it grows where the curve bends.
+    """
+    depth = 4
+
+    def __init__(self):
+        self._series = dict()
+
+    def add(self, u_src, u_control, f):
+        self._series.setdefault(u_src, list()).append((u_control, f))
+
+    def clear(self):
+        self._series.clear()
+
+    def predict(self, u_src, u_control):
+        """(f, uncertainty), (None, None) when nothing is known yet."""
+        points = self._series.get(u_src, list())[-self.depth:]
+        if len(points) >= 2:
+            us, fs = np.array(points).T
+            slope = (fs[-1] - fs[-2]) / (us[-1] - us[-2]) if us[-1] != us[-2] else 0.0
+            linear = fs[-1] + slope * (u_control - us[-1])
+            if len(points) < 3 or len(np.unique(us)) < 3:
+                return linear, abs(linear - fs[-1]) / 2
+            quadratic = np.polyval(np.polyfit(us, fs, 2), u_control)
+            return quadratic, abs(quadratic - linear)
+
+        others = [u for u in self._series if u != u_src and len(self._series[u]) >= 2]
+        if others:
+            nearest = min(others, key=lambda u: abs(u - u_src))
+            us, fs = np.array(sorted(self._series[nearest])).T
+            f = float(np.interp(u_control, us, fs))
+            return f, float(np.ptp(fs)) / max(len(fs) - 1, 1)
+
+        if points:
+            return points[-1][1], None
+        return None, None
+
+    def window(self, u_src, u_control, min_span):
+        """(center, span) for the next step, span is at least min_span, None center means unknown."""
+        f, uncertainty = self.predict(u_src, u_control)
+        if f is None or uncertainty is None:
+            return f, None
+        return f, max(min_span, 4 * uncertainty)
+
+
+class SpanTracker:
+    """
+    Trace window that follows the tuning curve: the next step frequency and its uncertainty come
+    from a TuningPredictor, the analyzer is re-tuned only when fundamental or top harmonic
+    would leave the current window. Until a series is predicted the window spans the whole
+    f_min..f_max range up to the top harmonic.
+
+    A step without a valid fundamental peak is recorded with `miss`, `retry` hands the missed
+    steps back for another pass with the search widened `widen` times per pass; once it
+    covers f_min..f_max the default window is used and a miss there is final.
+    """
+    widen = 4
+
+    def __init__(self, f_min, f_max, margin, top_order=3):
+        self._f_min = f_min
+        self._f_max = f_max
+        self._default = (f_min - margin, top_order * f_max + margin)
+        self._margin = margin
+        self._top = top_order
+        self._predictor = TuningPredictor()
+        self._missed = list()
+        self._passes = 0
+
+        self.window = None
+        self.retunes = 0
+        self.retries = 0
+
+    def add(self, u_src, u_control, f):
+        self._predictor.add(u_src, u_control, f)
+
+    def predict(self, u_src, u_control):
+        return self._predictor.predict(u_src, u_control)[0]
+
+    def search(self, u_src, u_control):
+        """(f_guess, half width, default) of the fundamental search at this step."""
+        f, uncertainty = self._predictor.predict(u_src, u_control)
+        full = (self._f_max - self._f_min) / 2 + self._margin
+        if f is None or uncertainty is None:
+            return (self._f_min + self._f_max) / 2, full, True
+        half = max(2 * self._margin, 4 * uncertainty) * self.widen ** self._passes
+        if half >= full:
+            return (self._f_min + self._f_max) / 2, full, True
+        return f, half, False
+
+    def next_window(self, u_src, u_control):
+        """(start, stop, changed) of the window for the next step."""
+        f, half, default = self.search(u_src, u_control)
+        if default:
+            wanted = self._default
+        else:
+            # the top harmonic moves `top` times as far as the fundamental
+            wanted = (f - half, self._top * (f + half))
+            if self.window is not None:
+                start, stop = self.window
+                if start <= f - half / 2 and self._top * (f + half / 2) <= stop:
+                    return start, stop, False
+        changed = wanted != self.window
+        if changed:
+            self.window = wanted
+            self.retunes += 1
+        return wanted[0], wanted[1], changed
+
+    def miss(self, step):
+        self._missed.append(step)
+
+    def retry(self):
+        """Steps missed since the last call, to be swept again with a wider window; None when nothing was missed."""
+        if not self._missed:
+            self._passes = 0
+            return None
+        steps, self._missed = self._missed, list()
+        self._passes += 1
+        self.retries += len(steps)
+        return steps
+
+
+def _bins(lo, hi, start, step, n):
+    return max(0, int(np.floor((lo - start) / step))), min(n, int(np.ceil((hi - start) / step)) + 1)
+
+
+def _refine(trace, peaks, start, step):
+    # vertex of the parabola through the peak bin and its neighbours
+    n = len(trace)
+    left = trace[np.clip(peaks - 1, 0, n - 1)]
+    mid = trace[peaks]
+    right = trace[np.clip(peaks + 1, 0, n - 1)]
+    denom = left - 2 * mid + right
+    edge = (peaks == 0) | (peaks == n - 1) | ~np.isfinite(denom) | (denom == 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shift = np.where(edge, 0.0, 0.5 * (left - right) / denom)
+    return start + (peaks + shift) * step, mid - 0.25 * (left - right) * shift
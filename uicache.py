@@ -0,0 +1,41 @@
+import importlib.util
+
+from pathlib import Path
+
+CACHE_DIR = Path('__uicache__')
+
+
+def load_ui(path, instance):
+    """
+    Build a .ui form on `instance` from python code generated once by uic.compileUi.
+    The generated module is cached per (ui file, mtime, size), so warm starts skip XML parsing
+    and the uic import. Widgets are attributes of the returned Ui_* object.
+    """
+    path = Path(path)
+    stat = path.stat()
+    module_path = CACHE_DIR / f'{path.stem}_{stat.st_mtime_ns}_{stat.st_size}.py'
+
+    if not module_path.is_file():
+        _compile(path, module_path)
+
+    spec = importlib.util.spec_from_file_location(f'_ui_{path.stem}', module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    ui_class = next(v for k, v in vars(module).items() if k.startswith('Ui_'))
+    ui = ui_class()
+    ui.setupUi(instance)
+    return ui
+
+
+def _compile(path, module_path):
+    from PyQt5 import uic
+
+    CACHE_DIR.mkdir(exist_ok=True)
+    for stale in CACHE_DIR.glob(f'{path.stem}_*.py'):
+        stale.unlink()
+
+    tmp_path = module_path.with_suffix('.tmp')
+    with open(tmp_path, mode='wt', encoding='utf-8') as f:
+        uic.compileUi(str(path), f)
+    tmp_path.replace(module_path)
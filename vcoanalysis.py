@@ -0,0 +1,98 @@
+import warnings
+
+import numpy as np
+
+
+def vco_characteristics(u_src, u_control, f, p, i):
+    """
+    Tuning sweep characteristics for every supply voltage series, computed in one vectorized pass.
+    Inputs are flat arrays with one element per measured point, in any order.
+
+    Per series: frequency range and tuning range, Kvco = df/dUупр (second order central differences,
+    same as np.gradient on each series), linearity error vs. least squares line,
+    output power min / max / flatness, current draw min / max, supply pushing df/dUп.
+    """
+    order = np.lexsort((u_control, u_src))
+    us, uc, f, p, i = (np.asarray(a, dtype=float)[order] for a in (u_src, u_control, f, p, i))
+
+    supplies, starts, group, counts = np.unique(us, return_index=True, return_inverse=True, return_counts=True)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        kvco = _grouped_gradient(f, uc, starts, counts)
+
+        f_min = np.minimum.reduceat(f, starts)
+        f_max = np.maximum.reduceat(f, starts)
+        tuning_range = f_max - f_min
+
+        slope, offset = _grouped_linear_fit(uc, f, starts, counts)
+        deviation = np.abs(f - (offset[group] + slope[group] * uc))
+        linearity = np.maximum.reduceat(deviation, starts) / tuning_range * 100
+
+        p_min = np.minimum.reduceat(p, starts)
+        p_max = np.maximum.reduceat(p, starts)
+
+        pushing = _pushing(supplies, group, uc, f)
+
+    finite = np.where(np.isfinite(kvco), kvco, np.nan)
+    return {
+        'u_src': supplies,
+        'f_min': f_min,
+        'f_max': f_max,
+        'tuning_range': tuning_range,
+        'kvco': kvco,
+        'kvco_min': np.fmin.reduceat(finite, starts),
+        'kvco_max': np.fmax.reduceat(finite, starts),
+        'linearity': linearity,
+        'p_min': p_min,
+        'p_max': p_max,
+        'flatness': p_max - p_min,
+        'i_min': np.minimum.reduceat(i, starts),
+        'i_max': np.maximum.reduceat(i, starts),
+        'pushing': pushing,
+        'order': order,
+    }
+
+
+def _grouped_gradient(y, x, starts, counts):
+    grad = np.full(len(y), np.nan)
+    first = starts
+    last = starts + counts - 1
+
+    interior = np.ones(len(y), dtype=bool)
+    interior[first] = False
+    interior[last] = False
+    k = np.nonzero(interior)[0]
+    hs = x[k] - x[k - 1]
+    hd = x[k + 1] - x[k]
+    grad[k] = (hs ** 2 * y[k + 1] + (hd ** 2 - hs ** 2) * y[k] - hd ** 2 * y[k - 1]) / (hs * hd * (hd + hs))
+
+    # one-sided at series edges, single point series have no slope
+    multi = counts > 1
+    first = first[multi]
+    last = last[multi]
+    grad[first] = (y[first + 1] - y[first]) / (x[first + 1] - x[first])
+    grad[last] = (y[last] - y[last - 1]) / (x[last] - x[last - 1])
+    return grad
+
+
+def _grouped_linear_fit(x, y, starts, counts):
+    sx = np.add.reduceat(x, starts)
+    sy = np.add.reduceat(y, starts)
+    sxx = np.add.reduceat(x * x, starts)
+    sxy = np.add.reduceat(x * y, starts)
+    slope = (counts * sxy - sx * sy) / (counts * sxx - sx * sx)
+    offset = (sy - slope * sx) / counts
+    return slope, offset
+
+
+def _pushing(supplies, group, uc, f):
+    # max |df/dUп| over the common u_control grid, needs at least two supply voltages
+    if len(supplies) < 2:
+        return np.full(len(supplies), np.nan)
+    grid_u = np.unique(uc)
+    grid = np.full((len(supplies), len(grid_u)), np.nan)
+    grid[group, np.searchsorted(grid_u, uc)] = f
+    with warnings.catch_warnings():
+        # series without a shared u_control step have no pushing, NaN is the answer
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanmax(np.abs(np.gradient(grid, supplies, axis=0)), axis=1)